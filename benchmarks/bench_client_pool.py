@@ -0,0 +1,75 @@
+# Measures memory per account, throughput and open sockets of a ClientPool against separate clients.
+# The requests go to a local aiohttp server instead of the API.
+# Run from the repository root: python -m benchmarks.bench_client_pool
+from aiohttp import web
+from asyncio import gather
+from asyncio import run
+from gc import collect
+from projz import Client
+from projz import ClientPool
+from projz.api import RequestManager
+from time import perf_counter
+import tracemalloc
+
+HOST, PORT = "127.0.0.1", 8768
+REQUESTS = 3000
+
+
+async def _profile(request: web.Request) -> web.Response:
+    return web.json_response({"uid": int(request.match_info["uid"]), "nickname": "x", "extensions": {}})
+
+
+def _idle_sockets(connector) -> int:
+    return sum(len(connections) for connections in connector._conns.values())
+
+
+async def bench_pool(accounts: int):
+    collect()
+    tracemalloc.start()
+    pool = ClientPool()
+    for _ in range(accounts): pool.add()
+    await pool.run_all(lambda client: client.get_user_info(1))
+    collect()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    started_at = perf_counter()
+    await pool.distribute(
+        lambda client, uid: client.get_user_info(uid),
+        range(REQUESTS),
+        concurrency_per_account=max(1, 64 // accounts)
+    )
+    elapsed = perf_counter() - started_at
+    print(
+        f"pool of {accounts:3d}: {memory / accounts / 1024:6.1f} KiB per account, "
+        f"{REQUESTS / elapsed:6.0f} req/s, {_idle_sockets(pool.connector)} idle sockets"
+    )
+    await pool.aclose()
+
+
+async def bench_separate(accounts: int):
+    clients = [Client() for _ in range(accounts)]
+    started_at = perf_counter()
+    await gather(*(clients[uid % accounts].get_user_info(uid) for uid in range(REQUESTS)))
+    elapsed = perf_counter() - started_at
+    idle = sum(_idle_sockets(client.connector) for client in clients)
+    print(f"{accounts:3d} separate clients: {REQUESTS / elapsed:6.0f} req/s, {idle} idle sockets")
+    for client in clients: await client.aclose()
+
+
+async def main():
+    get_session = RequestManager.get_session
+    RequestManager.get_session = lambda self, base_url: get_session(self, f"http://{HOST}:{PORT}")
+    app = web.Application()
+    app.router.add_get("/v1/users/profile/{uid}", _profile)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, HOST, PORT).start()
+    try:
+        for accounts in (1, 10, 100): await bench_pool(accounts)
+        for accounts in (10, 100): await bench_separate(accounts)
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    run(main())
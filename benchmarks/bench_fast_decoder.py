@@ -0,0 +1,44 @@
+# Compares the compiled model decoders with the generic DataClassJsonMixin.from_dict.
+# Run from the repository root: python -m benchmarks.bench_fast_decoder
+from dataclasses_json import DataClassJsonMixin
+from projz.model import Chat
+from projz.model import ChatMessage
+from projz.model import User
+from timeit import timeit
+import warnings
+
+NUMBER = 3000
+
+USER = {
+    "uid": 1,
+    "nickname": "n",
+    "createdTime": 1690000000,
+    "icon": {"baseUrl": "u", "mediaId": 1, "resourceList": [{"width": 1, "height": 1, "url": "x"}]},
+    "extensions": {"a": 1}
+}
+MESSAGE = {
+    "threadId": 1,
+    "uid": 1,
+    "messageId": 5,
+    "type": 1,
+    "content": "hi",
+    "createdTime": 1690000000,
+    "author": USER,
+    "extensions": {}
+}
+CHAT = {"threadId": 1, "title": "t", "membersSummary": [USER, USER, USER], "host": USER, "latestMessage": MESSAGE}
+
+
+def main():
+    warnings.simplefilter("ignore")
+    for cls, document in ((ChatMessage, MESSAGE), (User, USER), (Chat, CHAT)):
+        def generic(): return DataClassJsonMixin.from_dict.__func__(cls, document)
+        def compiled(): return cls.from_dict(document)
+        assert generic() == compiled()
+        generic_us = timeit(generic, number=NUMBER) / NUMBER * 1e6
+        compiled_us = timeit(compiled, number=NUMBER) / NUMBER * 1e6
+        print(f"{cls.__name__}: from_dict {generic_us:.1f} us -> compiled {compiled_us:.1f} us ({generic_us / compiled_us:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
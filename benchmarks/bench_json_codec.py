@@ -0,0 +1,66 @@
+# Compares the JSON codecs with the previous text()+ujson parsing and to_json() encoding.
+# Run from the repository root: python -m benchmarks.bench_json_codec
+from projz.model import ChatMessage
+from projz.model import User
+from projz.util import OrjsonCodec
+from projz.util import UjsonCodec
+from timeit import timeit
+import ujson
+import warnings
+
+NUMBER = 2000
+
+USER = {
+    "uid": 123456789,
+    "nickname": "ник 名前 name",
+    "createdTime": 1690000000,
+    "bio": "x" * 300,
+    "gender": 1,
+    "status": 1,
+    "icon": {
+        "baseUrl": "https://cdn/x",
+        "mediaId": 1,
+        "resourceList": [{"width": i, "height": i, "url": f"https://cdn/{i}.jpg"} for i in range(4)]
+    },
+    "extensions": {"a": 1, "b": [1, 2, 3]},
+    "nameCardBackground": None,
+    "followersCount": 10
+}
+MESSAGE = {
+    "threadId": 1,
+    "uid": 1,
+    "messageId": 5,
+    "type": 1,
+    "content": "привет 👋 hello " * 5,
+    "createdTime": 1690000000,
+    "author": USER,
+    "extensions": {}
+}
+PAGE = {"list": [MESSAGE] * 30, "pagination": {"nextPageToken": "abc"}}
+
+
+def _us(function) -> float:
+    return timeit(function, number=NUMBER) / NUMBER * 1e6
+
+
+def main():
+    warnings.simplefilter("ignore")
+    ujson_codec, orjson_codec = UjsonCodec(), OrjsonCodec()
+    for name, payload in (("User", USER), ("ChatMessage", MESSAGE), ("messages page x30", PAGE)):
+        raw = ujson.dumps(payload, ensure_ascii=False).encode("utf-8")
+        print(
+            f"loads {name} ({len(raw)} B): text()+ujson {_us(lambda: ujson.loads(raw.decode('utf-8'))):.1f} us, "
+            f"ujson bytes {_us(lambda: ujson_codec.loads(raw)):.1f} us, "
+            f"orjson bytes {_us(lambda: orjson_codec.loads(raw)):.1f} us"
+        )
+    for name, model in (("User", User.from_dict(USER)), ("ChatMessage", ChatMessage.from_dict(MESSAGE))):
+        assert ujson.loads(model.to_json()) == orjson_codec.loads(orjson_codec.dumps_model(model))
+        print(
+            f"dumps {name}: to_json().encode() {_us(lambda: model.to_json().encode('utf-8')):.1f} us, "
+            f"ujson codec {_us(lambda: ujson_codec.dumps_model(model)):.1f} us, "
+            f"orjson codec {_us(lambda: orjson_codec.dumps_model(model)):.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
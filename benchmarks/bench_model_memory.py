@@ -0,0 +1,62 @@
+# Measures the memory of decoded models, nested objects included, with slotted models and with plain dataclass
+# copies of them, which is how the models were defined before.
+# Run from the repository root: python -m benchmarks.bench_model_memory
+from dataclasses import fields
+from dataclasses import is_dataclass
+from dataclasses import make_dataclass
+from gc import collect
+from projz.model import Chat
+from projz.model import ChatMessage
+from projz.model import Media
+from projz.model import User
+from typing import Any
+import tracemalloc
+import warnings
+
+NUMBER = 5000
+
+MEDIA = {"baseUrl": "https://cdn/x", "mediaId": 7, "resourceList": [{"width": 1, "height": 1, "url": "https://cdn/1.jpg"}]}
+USER = {"uid": 123, "nickname": "name", "createdTime": 1690000000, "icon": MEDIA, "gender": 1, "status": 1}
+MESSAGE = {"threadId": 1, "uid": 1, "messageId": 5, "type": 1, "content": "hi", "createdTime": 1690000000, "author": USER}
+CHAT = {"threadId": 1, "title": "t", "host": USER, "membersSummary": [USER, USER], "latestMessage": MESSAGE, "icon": MEDIA}
+
+_plain_classes: dict[type, type] = {}
+
+
+def plain(value: Any) -> Any:
+    # A copy of the decoded object graph built from plain dataclasses with the same fields in the same order.
+    if is_dataclass(value):
+        cls = type(value)
+        plain_cls = _plain_classes.get(cls)
+        if plain_cls is None:
+            plain_cls = _plain_classes[cls] = make_dataclass(cls.__name__, [(field.name, Any) for field in fields(cls)])
+        return plain_cls(**{field.name: plain(getattr(value, field.name)) for field in fields(cls)})
+    if isinstance(value, list): return [plain(item) for item in value]
+    if isinstance(value, dict): return {key: plain(item) for key, item in value.items()}
+    return value
+
+
+def measure(decode) -> float:
+    decode()
+    collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [decode() for _ in range(NUMBER)]
+    collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / NUMBER
+
+
+def main():
+    warnings.simplefilter("ignore")
+    print(f"{'':12} {'dataclass':>10} {'slotted':>10}")
+    for cls, document in ((Media, MEDIA), (User, USER), (ChatMessage, MESSAGE), (Chat, CHAT)):
+        before = measure(lambda: plain(cls.from_dict(document)))
+        after = measure(lambda: cls.from_dict(document))
+        print(f"{cls.__name__:12} {before:8.0f} B {after:8.0f} B")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,10 @@
 from .client import *
+from .client_pool import ClientPool
+from .api.util import ResponseCache
+from .api.util import RetryPolicy
+from .api.util import RateLimiter
+from .api.util import ConcurrencyLimiter
+from .api.util import HedgePolicy
 import projz.error
 import projz.api
 
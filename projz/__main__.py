@@ -7,6 +7,8 @@ from sys import exit as sys_exit
 from aiofiles import open as async_open
 from os import remove
 from . import *
+from .runner import Supervisor
+from ujson import loads
 
 parser = ArgumentParser(description="ProjZ.py library command line interface")
 parser.add_argument("action", type=str, help="The action to be performed. "
@@ -20,6 +22,19 @@ parser.add_argument("--thread", type=str, dest="thread", help="Link to the chat
 parser.add_argument("--message", type=str, dest="message", help="Text of the message to send")
 parser.add_argument("--repeat", type=int, dest="repeat", help="The number of messages sent")
 parser.add_argument("--circle", type=str, dest="circle", help="Link to the circle to join or leave")
+parser.add_argument("--bot", type=str, dest="bot", help="module:attribute of the Client or ClientPool to run")
+parser.add_argument("--accounts", type=str, dest="accounts", help="JSON file with the list of the accounts to run")
+parser.add_argument("--workers", type=int, dest="workers", help="Number of the worker processes")
+parser.add_argument(
+    "--shard",
+    type=str,
+    dest="shard",
+    default="threads",
+    choices=["threads", "accounts"],
+    help="Split the chats (threads) or the accounts (accounts) between the worker processes"
+)
+parser.add_argument("--stats-interval", type=float, dest="stats_interval", default=30,
+                    help="How often the worker processes report stats, in seconds")
 parser.add_argument(
     "-fLH",
     "--flag-logging-http",
@@ -238,6 +253,20 @@ async def action_listen():
     )
     print(f"[+] Waiting for the messages...")
 
+@with_args("bot")
+def action_run(bot: str):
+    if cli_args.accounts is not None:
+        with open(cli_args.accounts, "r") as file:
+            accounts = loads(file.read())
+    elif cli_args.login is not None and cli_args.password is not None and cli_args.auth_type is not None:
+        accounts = [{"phone_number" if cli_args.auth_type == "phone" else "email": cli_args.login,
+                     "password": cli_args.password}]
+    else:
+        print("Error: Specify the accounts file or login, password and auth type.")
+        return
+    print(f"[+] Starting {cli_args.workers or 'one per CPU'} worker processes...")
+    Supervisor(bot, accounts, cli_args.workers, cli_args.shard, cli_args.stats_interval).run()
+
 action_mapping = {
     "list-actions": [action_list_actions, "Print a list of all possible actions."],
     "clear-auth": [action_clear_auth, "Remove auth file."],
@@ -246,7 +275,8 @@ action_mapping = {
     "send-message": [action_send_message, "Send message to the chat."],
     "join-circle": [action_join_circle, "Join to the circle by the link."],
     "leave-circle": [action_leave_circle, "Leave from the circle by the link."],
-    "listen": [action_listen, "Listen for the chat messages."]
+    "listen": [action_listen, "Listen for the chat messages."],
+    "run": [action_run, "Run the handlers of a bot (--bot module:attribute) in several worker processes."]
 }
 
 
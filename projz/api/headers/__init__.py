@@ -1,2 +1,3 @@
+from .signing_context import SigningContext
 from .base_headers_provider import IHeadersProvider
 from .headers_provider import HeadersProvider
@@ -1,4 +1,6 @@
+from .signing_context import SigningContext
 from abc import ABC
+from typing import Optional
 
 
 class IHeadersProvider(ABC):
@@ -19,6 +21,14 @@ class IHeadersProvider(ABC):
 
     def remove_sid(self) -> None: ...
 
+    def create_signing_context(
+        self,
+        device_id: str,
+        language: str,
+        country_code: str,
+        time_zone: int
+    ) -> Optional[SigningContext]: ...
+
     async def generate_request_signature(self, path: dict, headers: dict, body: bytes) -> str: ...
 
     async def generate_device_id(self, installation_id: str) -> str: ...
@@ -1,4 +1,5 @@
 from .base_headers_provider import IHeadersProvider
+from .signing_context import SigningContext
 from hashlib import sha1
 from hashlib import sha256
 from hmac import HMAC
@@ -7,8 +8,12 @@ from time import time
 
 
 class HeadersProvider(IHeadersProvider):
+    SIGNATURE_KEY = bytes.fromhex("ce070279278de1b6390b76942c13a0b0aa0fda6aedd6f2d655eda7cf6543b35f" + ("6a" * 32))
+
     def __init__(self):
         self.sid = ""
+        self._mac = HMAC(key=self.SIGNATURE_KEY, digestmod=sha256)
+        self._signable_header_keys = tuple(self.get_signable_header_keys())
 
     def get_persistent_headers(self) -> dict:
         return {
@@ -44,12 +49,17 @@ class HeadersProvider(IHeadersProvider):
 
     def remove_sid(self) -> None: self.sid = ""
 
+    def create_signing_context(self, device_id: str, language: str, country_code: str, time_zone: int) -> SigningContext:
+        headers = self.get_persistent_headers()
+        headers.update(self.get_request_info_headers(device_id, "", language, country_code, time_zone))
+        for dynamic in ("nonce", "reqTime", "sId"): headers.pop(dynamic, None)
+        return SigningContext(self.SIGNATURE_KEY, headers, list(self._signable_header_keys))
+
     async def generate_request_signature(self, path: str, headers: dict, body: bytes) -> str:
-        mac = HMAC(key=bytes.fromhex("ce070279278de1b6390b76942c13a0b0aa0fda6aedd6f2d655eda7cf6543b35f" + ("6a" * 32)),
-                   msg=path.encode("utf-8"),
-                   digestmod=sha256)
-        for header in [headers[signable] for signable in self.get_signable_header_keys() if signable in headers]:
-            mac.update(header.encode("utf-8"))
+        mac = self._mac.copy()
+        mac.update(path.encode("utf-8"))
+        for signable in self._signable_header_keys:
+            if signable in headers: mac.update(headers[signable].encode("utf-8"))
         if body: mac.update(body)
         return b64encode(bytes.fromhex("04") + mac.digest()).decode("utf-8")
 
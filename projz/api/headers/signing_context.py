@@ -0,0 +1,45 @@
+from hmac import HMAC
+from hashlib import sha256
+from base64 import b64encode
+from time import time
+from typing import Optional
+
+
+class SigningContext:
+    def __init__(self, key: bytes, static_headers: dict, signable_keys: list[str], prefix: bytes = bytes.fromhex("04")):
+        self.mac = HMAC(key=key, digestmod=sha256)
+        self.static_headers = static_headers
+        self.signable_keys = tuple(signable_keys)
+        self.prefix = prefix
+        self.encoded_headers = {
+            key: value.encode("utf-8")
+            for key, value in static_headers.items()
+            if key in self.signable_keys
+        }
+
+    def build_headers(self, nonce: str, sid: Optional[str], extra: Optional[dict] = None) -> dict:
+        headers = self.static_headers.copy()
+        headers["nonce"] = nonce
+        headers["reqTime"] = str(int(time() * 1000))
+        if sid is not None: headers["sId"] = sid
+        if extra: headers.update(extra)
+        return headers
+
+    def start(self, path: str, headers: dict) -> HMAC:
+        mac = self.mac.copy()
+        mac.update(path.encode("utf-8"))
+        static_headers, encoded_headers = self.static_headers, self.encoded_headers
+        for key in self.signable_keys:
+            value = headers.get(key)
+            if value is None: continue
+            # Values taken from the static block are the very same objects, so their bytes can be reused.
+            mac.update(encoded_headers[key] if static_headers.get(key) is value else value.encode("utf-8"))
+        return mac
+
+    def finish(self, mac: HMAC) -> str:
+        return b64encode(self.prefix + mac.digest()).decode("utf-8")
+
+    def sign(self, path: str, headers: dict, body: Optional[bytes] = None) -> str:
+        mac = self.start(path, headers)
+        if body: mac.update(body)
+        return self.finish(mac)
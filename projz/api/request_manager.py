@@ -1,20 +1,37 @@
 from .headers import IHeadersProvider
+from .headers import SigningContext
 from .util import CopyToBufferWriter
+from .util import MultipartFileStream
+from .util import ResponseCache
+from .util import SingleFlight
+from .util import RetryPolicy
+from .util import RateLimiter
+from .util import ConcurrencyLimiter
+from .util import HedgePolicy
 from ..error import ApiException
 from ..error import BadResponse
+from ..error import CaptchaCaught
+from ..error import TooManyRequests
+from ..util import IJsonCodec
+from ..util import get_default_codec
 from io import BytesIO
 from aiohttp import ClientSession
+from aiohttp import TCPConnector
 from aiohttp import MultipartWriter
 from typing import Optional
 from typing import Union
 from uuid import uuid4
-from ujson import dumps
-from ujson import loads
-from ujson import JSONDecodeError
 from dataclasses_json import DataClassJsonMixin
 from urllib.parse import urlencode
 from datetime import datetime
 
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def _hashable(body: Optional[Union[Buffer, MultipartFileStream]]) -> Optional[Union[bytes, MultipartFileStream]]:
+    # Only the keys of the cache and of coalesced requests need a copy of a mutable buffer.
+    return bytes(body) if isinstance(body, (bytearray, memoryview)) else body
+
 
 class RequestManager:
     def __init__(
@@ -23,7 +40,19 @@ class RequestManager:
         language: str = "en-US",
         country_code: str = "us",
         time_zone: int = 180,
-        logging: bool = False
+        logging: bool = False,
+        connector_limit: int = 100,
+        connector_limit_per_host: int = 0,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 60,
+        cache: Optional[ResponseCache] = None,
+        coalesce_requests: bool = True,
+        connector: Optional[TCPConnector] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        concurrency_limiter: Optional[ConcurrencyLimiter] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        json_codec: Optional[IJsonCodec] = None
     ):
         self.provider = provider
         self.language = language
@@ -31,14 +60,93 @@ class RequestManager:
         self.time_zone = time_zone
         self.device_id = None
         self.logging = logging
+        self.connector_limit = connector_limit
+        self.connector_limit_per_host = connector_limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        # A connector passed in is shared with other managers, so it is used but never closed here.
+        self.connector: Optional[TCPConnector] = connector
+        self.owns_connector = connector is None
+        self.sessions: dict[str, ClientSession] = {}
+        self.signing_context: Optional[SigningContext] = None
+        self.signing_context_key = None
+        self.cache = cache
+        self.coalesce_requests = coalesce_requests
+        self.single_flight = SingleFlight()
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+        self.hedge_policy = hedge_policy
+        self.json_codec = json_codec if json_codec is not None else get_default_codec()
+
+    def get_session(self, base_url: str) -> ClientSession:
+        session = self.sessions.get(base_url)
+        if session is not None and not session.closed:
+            return session
+        session = ClientSession(base_url=base_url, connector=self.get_connector(), connector_owner=False)
+        self.sessions[base_url] = session
+        return session
+
+    def get_connector(self) -> TCPConnector:
+        if self.owns_connector and (self.connector is None or self.connector.closed):
+            self.connector = TCPConnector(
+                limit=self.connector_limit,
+                limit_per_host=self.connector_limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True,
+                keepalive_timeout=self.keepalive_timeout
+            )
+        return self.connector
+
+    async def aclose(self) -> None:
+        for session in self.sessions.values():
+            await session.close()
+        self.sessions.clear()
+        if self.owns_connector and self.connector is not None:
+            await self.connector.close()
+            self.connector = None
+
+    def invalidate_cache(self, *paths: str) -> None:
+        if self.cache is None: return
+        for path in paths: self.cache.invalidate(path)
 
-    async def build_headers(self, endpoint: str, body: Optional[bytes] = None, extra: Optional[dict] = None) -> dict:
+    def get_signing_context(self) -> Optional[SigningContext]:
+        context_key = (self.device_id, self.language, self.country_code, self.time_zone)
+        if self.signing_context_key != context_key:
+            self.signing_context = self.provider.create_signing_context(*context_key)
+            self.signing_context_key = context_key
+        return self.signing_context
+
+    async def build_headers(
+        self,
+        endpoint: str,
+        body: Optional[Union[Buffer, MultipartFileStream]] = None,
+        extra: Optional[dict] = None,
+        nonce: Optional[str] = None
+    ) -> dict:
+        if nonce is None: nonce = str(uuid4())
         if self.device_id is None:
             self.device_id = await self.provider.generate_device_id(str(uuid4()))
+        context = self.get_signing_context()
+        if context is not None:
+            headers = context.build_headers(nonce, self.provider.get_sid(), extra)
+            if isinstance(body, MultipartFileStream):
+                mac = context.start(endpoint, headers)
+                await body.prepare(mac.update)
+                headers["HJTRFS"] = context.finish(mac)
+                headers["Content-Length"] = str(body.size)
+            else:
+                headers["HJTRFS"] = context.sign(endpoint, headers, body)
+            return headers
+        if isinstance(body, MultipartFileStream):
+            await body.prepare()
+            headers = await self.build_headers(endpoint, await body.read(), extra, nonce)
+            headers["Content-Length"] = str(body.size)
+            return headers
         headers = self.provider.get_persistent_headers()
         headers.update(self.provider.get_request_info_headers(
             self.device_id,
-            str(uuid4()),
+            nonce,
             self.language,
             self.country_code,
             self.time_zone
@@ -52,37 +160,129 @@ class RequestManager:
         method: str,
         endpoint: str,
         params: Optional[dict] = None,
-        body: Optional[bytes] = None,
+        body: Optional[Union[Buffer, MultipartFileStream]] = None,
         content_type: Optional[str] = None,
-        web: bool = True
+        web: bool = True,
+        *,
+        cache_family: Optional[str] = None,
+        idempotent: bool = False,
+        hedge: bool = False
     ) -> dict:
         if not endpoint.startswith("/"): endpoint = f"/{endpoint}"
+        path = endpoint.split("?", 1)[0]
         if params: endpoint += f"?{urlencode(params)}"
         if web: endpoint = f"/api/f{endpoint}"
+        streaming = isinstance(body, MultipartFileStream)
+        cache_key = None
+        if cache_family is not None and self.cache is not None and not streaming:
+            cache_key = (method, endpoint, _hashable(body))
+            cached = self.cache.get(cache_key)
+            if cached is not None: return cached
+            generation = self.cache.generation
+        # A POST is only sent twice when it is marked idempotent or carries a seqId the server deduplicates by.
+        retryable = self.retry_policy is not None and not streaming and (
+            method == "GET" or idempotent or (isinstance(body, (bytes, bytearray)) and b'"seqId"' in body)
+        )
+        hedged = hedge and (method == "GET" or idempotent) and not streaming and self.hedge_policy is not None
+
+        # Every attempt is signed again with a fresh nonce, the server rejects a nonce it has already seen.
+        def attempt():
+            if not hedged: return self._send(method, endpoint, body, content_type, web, str(uuid4()))
+            # The duplicate of a hedged request is a separate request as well.
+            return self.hedge_policy.run(
+                endpoint,
+                lambda: self._send(method, endpoint, body, content_type, web, str(uuid4()))
+            )
+
+        def send():
+            if not retryable: return attempt()
+            return self.retry_policy.run(attempt)
+
+        if self.coalesce_requests and (method == "GET" or idempotent) and not streaming:
+            response_json = await self.single_flight.run((method, endpoint, _hashable(body), content_type, web), send)
+        else:
+            response_json = await send()
+        if cache_key is not None: self.cache.put(cache_family, path, cache_key, response_json, generation)
+        return response_json
+
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        body: Optional[Union[Buffer, MultipartFileStream]],
+        content_type: Optional[str],
+        web: bool,
+        nonce: Optional[str] = None
+    ) -> dict:
+        # One limiter can be shared by the clients of a pool, the buckets of every account are kept apart.
+        if self.rate_limiter is not None: await self.rate_limiter.acquire(id(self), method, endpoint)
+        if self.concurrency_limiter is None: return await self._perform(method, endpoint, body, content_type, web, nonce)
+        return await self.concurrency_limiter.run(
+            endpoint,
+            lambda: self._perform(method, endpoint, body, content_type, web, nonce)
+        )
+
+    async def _perform(
+        self,
+        method: str,
+        endpoint: str,
+        body: Optional[Union[Buffer, MultipartFileStream]],
+        content_type: Optional[str],
+        web: bool,
+        nonce: Optional[str]
+    ) -> dict:
+        headers = await self.build_headers(
+            endpoint,
+            body,
+            {"Content-Type": content_type} if content_type is not None else None,
+            nonce
+        ) if not web else dict()
         if self.logging:
             request_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            body_size = body.size if isinstance(body, MultipartFileStream) else memoryview(body or bytes()).nbytes
             print(
                 f"[HTTP {request_time}] " +
-                (f"[{method} {endpoint}]" if body is None else f"[{method} {endpoint}] [{len(body)} bytes]")
+                (f"[{method} {endpoint}]" if body is None else f"[{method} {endpoint}] [{body_size} bytes]")
             )
-        async with ClientSession(base_url="https://api.projz.com" if not web else "https://www.projz.com") as session:
-            response = await session.request(
-                method,
-                endpoint,
-                headers=await self.build_headers(
-                    endpoint,
-                    body,
-                    {"Content-Type": content_type} if content_type is not None else None
-                ) if not web else dict(),
-                data=body
-            )
-            try: response_json = loads(await response.text())
-            except (JSONDecodeError, UnicodeDecodeError): raise BadResponse("Can't read response from Project Z API")
-            if "apiCode" in response_json: raise ApiException.get(response_json)
-            return response_json
+        session = self.get_session("https://api.projz.com" if not web else "https://www.projz.com")
+        async with session.request(
+            method,
+            endpoint,
+            headers=headers,
+            data=body.iterate() if isinstance(body, MultipartFileStream) else body
+        ) as response:
+            if response.status == 429:
+                self._throttled(method, endpoint)
+                raise TooManyRequests("Too many requests to Project Z API")
+            # The body is parsed straight from the received bytes, without decoding it to a str first.
+            try: response_json = self.json_codec.loads(await response.read())
+            except ValueError: raise BadResponse("Can't read response from Project Z API")
+        if "apiCode" in response_json:
+            error = ApiException.get(response_json)
+            if isinstance(error, CaptchaCaught): self._throttled(method, endpoint)
+            raise error
+        return response_json
 
-    async def get(self, endpoint: str, params: Optional[dict] = None, web: bool = False) -> dict:
-        return await self.request("GET", endpoint, params=params or dict(), web=web)
+    def _throttled(self, method: str, endpoint: str) -> None:
+        if self.rate_limiter is not None: self.rate_limiter.penalize(id(self), method, endpoint)
+
+    async def get(
+        self,
+        endpoint: str,
+        params: Optional[dict] = None,
+        web: bool = False,
+        *,
+        cache_family: Optional[str] = None,
+        hedge: bool = False
+    ) -> dict:
+        return await self.request(
+            "GET",
+            endpoint,
+            params=params or dict(),
+            web=web,
+            cache_family=cache_family,
+            hedge=hedge
+        )
 
     async def delete(self, endpoint: str, params: Optional[dict] = None, web: bool = False) -> dict:
         return await self.request("DELETE", endpoint, params=params or dict(), web=web)
@@ -90,21 +290,56 @@ class RequestManager:
     async def post(
         self,
         endpoint: str,
-        body: Union[bytes, str, dict, DataClassJsonMixin, MultipartWriter],
+        body: Union[Buffer, str, dict, DataClassJsonMixin, MultipartWriter, MultipartFileStream],
         content_type: Optional[str],
-        web: bool = False
+        web: bool = False,
+        *,
+        cache_family: Optional[str] = None,
+        idempotent: bool = False,
+        hedge: bool = False
     ) -> dict:
-        content = BytesIO()
-        if isinstance(body, bytes): content.write(body)
-        elif isinstance(body, str): content.write(body.encode("utf-8"))
-        elif isinstance(body, dict): content.write(dumps(body).encode("utf-8"))
-        elif isinstance(body, DataClassJsonMixin): content.write(body.to_json().encode("utf-8"))
-        elif isinstance(body, MultipartWriter): await body.write(CopyToBufferWriter(content))
+        if isinstance(body, MultipartFileStream):
+            return await self.request("POST", endpoint, body=body, content_type=content_type, web=web)
+        # Every body is serialized once, and the same buffer is signed and sent (and sent again on retries).
+        if isinstance(body, (bytes, bytearray, memoryview)): content = body
+        elif isinstance(body, str): content = body.encode("utf-8")
+        elif isinstance(body, dict): content = self.json_codec.dumps(body)
+        elif isinstance(body, DataClassJsonMixin): content = self.json_codec.dumps_model(body)
+        elif isinstance(body, MultipartWriter):
+            buffer = BytesIO()
+            await body.write(CopyToBufferWriter(buffer))
+            content = buffer.getbuffer()
         else: raise ValueError(f"Invalid request body type: \"{body.__class__.__name__}\"")
-        return await self.request("POST", endpoint, body=content.getvalue(), content_type=content_type, web=web)
+        return await self.request(
+            "POST",
+            endpoint,
+            body=content,
+            content_type=content_type,
+            web=web,
+            cache_family=cache_family,
+            idempotent=idempotent,
+            hedge=hedge
+        )
 
-    async def post_json(self, endpoint: str, body: Union[dict, DataClassJsonMixin], web: bool = False) -> dict:
-        return await self.post(endpoint, body=body, content_type="application/json; charset=UTF-8", web=web)
+    async def post_json(
+        self,
+        endpoint: str,
+        body: Union[dict, DataClassJsonMixin],
+        web: bool = False,
+        *,
+        cache_family: Optional[str] = None,
+        idempotent: bool = False,
+        hedge: bool = False
+    ) -> dict:
+        return await self.post(
+            endpoint,
+            body=body,
+            content_type="application/json; charset=UTF-8",
+            web=web,
+            cache_family=cache_family,
+            idempotent=idempotent,
+            hedge=hedge
+        )
 
     async def post_empty(self, endpoint: str, web: bool = False):
         return await self.post(endpoint, body="", content_type=None, web=web)
@@ -1 +1,8 @@
 from .copy_to_buffer_writer import CopyToBufferWriter
+from .multipart_file_stream import MultipartFileStream
+from .response_cache import ResponseCache
+from .single_flight import SingleFlight
+from .retry_policy import RetryPolicy
+from .rate_limiter import RateLimiter
+from .concurrency_limiter import ConcurrencyLimiter
+from .hedge_policy import HedgePolicy
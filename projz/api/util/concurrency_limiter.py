@@ -0,0 +1,161 @@
+from ...error import BadResponse
+from aiohttp import ClientConnectionError
+from aiohttp import ClientPayloadError
+from asyncio import CancelledError
+from asyncio import Future
+from asyncio import TimeoutError
+from asyncio import get_running_loop
+from collections import deque
+from time import monotonic
+from typing import Awaitable
+from typing import Callable
+from typing import Optional
+from typing import TypeVar
+
+T = TypeVar("T")
+
+_OVERLOAD_EXCEPTIONS = (ClientConnectionError, ClientPayloadError, TimeoutError, BadResponse)
+
+
+def endpoint_family(endpoint: str) -> str:
+    # "/v1/chat/threads/1/messages" -> "/v1/chat", "/biz/v1/gift-boxes" -> "/biz/v1/gift-boxes"
+    segments = endpoint.split("?", 1)[0].strip("/").split("/")
+    for index, segment in enumerate(segments):
+        if len(segment) > 1 and segment[0] == "v" and segment[1:].isdigit():
+            return "/" + "/".join(segments[:index + 2])
+    return "/" + "/".join(segments[:2])
+
+
+class _Family:
+    __slots__ = ("limit", "in_flight", "waiters", "short_latency", "baseline_latency", "observed_at", "decreased_at")
+
+    def __init__(self, limit: float):
+        self.limit = limit
+        self.in_flight = 0
+        self.waiters: deque[Future] = deque()
+        self.short_latency: Optional[float] = None
+        self.baseline_latency: Optional[float] = None
+        self.observed_at = 0.0
+        self.decreased_at = 0.0
+
+
+class ConcurrencyLimiter:
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 128,
+        backoff_ratio: float = 0.9,
+        tolerance: float = 2,
+        short_smoothing: float = 0.2,
+        baseline_window: float = 30
+    ):
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.tolerance = tolerance
+        self.short_smoothing = short_smoothing
+        self.baseline_window = baseline_window
+        self.families: dict[str, _Family] = {}
+        self.queued = 0
+        self.increases = 0
+        self.decreases = 0
+
+    def _family(self, endpoint: str) -> _Family:
+        name = endpoint_family(endpoint)
+        family = self.families.get(name)
+        if family is None: family = self.families[name] = _Family(float(self.initial_limit))
+        return family
+
+    async def run(self, endpoint: str, call: Callable[[], Awaitable[T]]) -> T:
+        family = self._family(endpoint)
+        await self._acquire(family)
+        started_at = monotonic()
+        try: result = await call()
+        except CancelledError:
+            self._release(family)
+            raise
+        except _OVERLOAD_EXCEPTIONS:
+            self._decrease(family, monotonic())
+            self._release(family)
+            raise
+        except BaseException:
+            # An API error is still an answer of a healthy server.
+            self._observe(family, monotonic() - started_at)
+            self._release(family)
+            raise
+        self._observe(family, monotonic() - started_at)
+        self._release(family)
+        return result
+
+    async def _acquire(self, family: _Family) -> None:
+        if not family.waiters and family.in_flight < int(family.limit):
+            family.in_flight += 1
+            return
+        future = get_running_loop().create_future()
+        family.waiters.append(future)
+        self.queued += 1
+        try: await future
+        except CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was already handed over, it goes to the next caller instead.
+                family.in_flight -= 1
+                self._wake(family)
+            raise
+
+    def _release(self, family: _Family) -> None:
+        family.in_flight -= 1
+        self._wake(family)
+
+    def _wake(self, family: _Family) -> None:
+        while family.waiters and family.in_flight < int(family.limit):
+            future = family.waiters.popleft()
+            if future.done(): continue
+            family.in_flight += 1
+            future.set_result(None)
+
+    def _observe(self, family: _Family, latency: float) -> None:
+        now = monotonic()
+        if family.short_latency is None:
+            family.short_latency = family.baseline_latency = latency
+            family.observed_at = now
+            return
+        family.short_latency += (latency - family.short_latency) * self.short_smoothing
+        # The baseline follows the fastest answers and drifts up within about baseline_window seconds,
+        # so a rise caused by our own load stays visible while a slower upstream becomes the new normal.
+        if latency < family.baseline_latency: family.baseline_latency = latency
+        else:
+            drift = min(1.0, (now - family.observed_at) / self.baseline_window)
+            family.baseline_latency += (latency - family.baseline_latency) * drift
+        family.observed_at = now
+        if family.short_latency > family.baseline_latency * self.tolerance:
+            self._decrease(family, now)
+        elif family.in_flight >= int(family.limit) - 1 and family.limit < self.max_limit:
+            # Additive increase: about one more slot per limit answers, and only while the limit is actually used.
+            family.limit = min(self.max_limit, family.limit + 1 / family.limit)
+            self.increases += 1
+
+    def _decrease(self, family: _Family, now: float) -> None:
+        # The requests that were in flight together with the slow one would cut the limit again,
+        # one decrease per latency interval is enough.
+        if now - family.decreased_at < (family.short_latency or 0): return
+        family.decreased_at = now
+        family.limit = max(self.min_limit, family.limit * self.backoff_ratio)
+        self.decreases += 1
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queued,
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "families": {
+                name: {
+                    "limit": int(family.limit),
+                    "in_flight": family.in_flight,
+                    "waiting": len(family.waiters),
+                    "latency": family.short_latency,
+                    "baseline_latency": family.baseline_latency
+                } for name, family in self.families.items()
+            }
+        }
@@ -1,5 +1,4 @@
 from io import BytesIO
-from asyncio import get_running_loop
 
 
 class CopyToBufferWriter:
@@ -7,4 +6,4 @@ class CopyToBufferWriter:
         self.buffer = buffer
 
     async def write(self, data: bytes):
-        await get_running_loop().run_in_executor(None, self.buffer.write, data)
+        self.buffer.write(data)
@@ -0,0 +1,105 @@
+from .rate_limiter import endpoint_template
+from ...util import LatencyRecorder
+from asyncio import FIRST_COMPLETED
+from asyncio import Task
+from asyncio import create_task
+from asyncio import wait
+from time import monotonic
+from typing import Awaitable
+from typing import Callable
+from typing import Optional
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class _Endpoint:
+    __slots__ = ("latency", "delay", "recorded")
+
+    def __init__(self, size: int):
+        self.latency = LatencyRecorder(size)
+        self.delay: Optional[float] = None
+        self.recorded = 0
+
+
+class HedgePolicy:
+    def __init__(
+        self,
+        percentile: float = 95,
+        budget_ratio: float = 0.05,
+        max_budget: float = 10,
+        min_samples: int = 20,
+        min_delay: float = 0.01,
+        window: int = 256
+    ):
+        self.percentile = percentile
+        self.budget_ratio = budget_ratio
+        self.max_budget = max_budget
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.window = window
+        self.endpoints: dict[str, _Endpoint] = {}
+        # Every request earns budget_ratio of a hedge, so the duplicates add at most that share of the load.
+        self.budget = 0.0
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.budget_exhausted = 0
+
+    def _endpoint(self, endpoint: str) -> _Endpoint:
+        template = endpoint_template(endpoint)
+        state = self.endpoints.get(template)
+        if state is None: state = self.endpoints[template] = _Endpoint(self.window)
+        return state
+
+    def _record(self, state: _Endpoint, seconds: float) -> None:
+        state.latency.record(seconds)
+        state.recorded += 1
+        # Sorting the window on every request would cost more than it saves, the delay is refreshed every 16 answers.
+        if state.recorded >= self.min_samples and (state.delay is None or state.recorded % 16 == 0):
+            state.delay = max(self.min_delay, state.latency.percentile(self.percentile))
+
+    async def _timed(self, state: _Endpoint, call: Callable[[], Awaitable[T]]) -> T:
+        started_at = monotonic()
+        result = await call()
+        self._record(state, monotonic() - started_at)
+        return result
+
+    async def run(self, endpoint: str, call: Callable[[], Awaitable[T]]) -> T:
+        state = self._endpoint(endpoint)
+        self.requests += 1
+        self.budget = min(self.max_budget, self.budget + self.budget_ratio)
+        if state.delay is None: return await self._timed(state, call)
+        primary = create_task(self._timed(state, call))
+        tasks: list[Task] = [primary]
+        try:
+            done, _ = await wait(tasks, timeout=state.delay)
+            if not done:
+                if self.budget < 1:
+                    self.budget_exhausted += 1
+                    return await primary
+                self.budget -= 1
+                self.hedged += 1
+                # The first request holds its connection, so the duplicate goes out over another pooled one.
+                tasks.append(create_task(self._timed(state, call)))
+            while True:
+                done, _ = await wait(tasks, return_when=FIRST_COMPLETED)
+                for task in done:
+                    tasks.remove(task)
+                    # A failed request only decides the call when no other one is left to answer.
+                    if task.exception() is None or not tasks:
+                        if task is not primary: self.hedge_wins += 1
+                        return task.result()
+        finally:
+            for task in tasks:
+                if not task.done(): task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "budget": self.budget,
+            "budget_exhausted": self.budget_exhausted,
+            "delays": {template: state.delay for template, state in self.endpoints.items()}
+        }
@@ -0,0 +1,90 @@
+from aiohttp.helpers import content_disposition_header
+from typing import Any
+from typing import AsyncIterator
+from typing import Callable
+from typing import Optional
+from typing import Union
+from uuid import uuid4
+from magic import from_buffer
+
+
+class MultipartFileStream:
+    MIME_SNIFF_SIZE = 2048
+
+    def __init__(self, file: Any, filename: str = "file", name: str = "media", chunk_size: int = 64 * 1024):
+        self.file = file
+        self.filename = filename
+        self.name = name
+        self.chunk_size = chunk_size
+        self.boundary = uuid4().hex
+        self.mime_type: Optional[str] = None
+        self.size: Optional[int] = None
+        self._start = 0
+        self._file_size = 0
+        self._preamble = bytes()
+        self._epilogue = f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    async def _rewind(self) -> None:
+        if not isinstance(self.file, (bytes, bytearray, memoryview)):
+            await self.file.seek(self._start)
+
+    async def _read_chunks(self) -> AsyncIterator[Union[bytes, memoryview]]:
+        if isinstance(self.file, (bytes, bytearray, memoryview)):
+            view = memoryview(self.file)
+            for offset in range(0, len(view), self.chunk_size):
+                yield view[offset:offset + self.chunk_size]
+            return
+        await self._rewind()
+        while True:
+            chunk = await self.file.read(self.chunk_size)
+            if not chunk: break
+            yield chunk
+
+    async def _measure(self) -> int:
+        if isinstance(self.file, (bytes, bytearray, memoryview)):
+            return len(self.file)
+        self._start = await self.file.tell()
+        end = await self.file.seek(0, 2)
+        await self.file.seek(self._start)
+        return end - self._start
+
+    async def prepare(self, digest: Optional[Callable[[bytes], Any]] = None) -> None:
+        # The signature has to be sent before the body, so the file is walked once here
+        # (MIME sniffing, size, signature) and once more in iterate() while it is streamed.
+        self._file_size = await self._measure()
+        first_chunk = True
+        async for chunk in self._read_chunks():
+            if first_chunk:
+                self._build_preamble(bytes(chunk[:self.MIME_SNIFF_SIZE]))
+                if digest is not None: digest(self._preamble)
+                first_chunk = False
+            if digest is not None: digest(chunk)
+        if first_chunk:
+            self._build_preamble(bytes())
+            if digest is not None: digest(self._preamble)
+        if digest is not None: digest(self._epilogue)
+        self.size = len(self._preamble) + self._file_size + len(self._epilogue)
+
+    def _build_preamble(self, leading_bytes: bytes) -> None:
+        self.mime_type = from_buffer(leading_bytes, mime=True) if leading_bytes else "application/octet-stream"
+        disposition = content_disposition_header("form-data", name=self.name, filename=self.filename)
+        self._preamble = (
+            f"--{self.boundary}\r\n"
+            f"Content-Type: {self.mime_type}\r\n"
+            f"Content-Length: {self._file_size}\r\n"
+            f"Content-Disposition: {disposition}\r\n\r\n"
+        ).encode("utf-8")
+
+    async def iterate(self) -> AsyncIterator[bytes]:
+        if self.size is None: await self.prepare()
+        yield self._preamble
+        async for chunk in self._read_chunks():
+            yield bytes(chunk) if isinstance(chunk, memoryview) else chunk
+        yield self._epilogue
+
+    async def read(self) -> bytes:
+        return b"".join([chunk async for chunk in self.iterate()])
@@ -0,0 +1,182 @@
+from asyncio import CancelledError
+from asyncio import Future
+from asyncio import TimerHandle
+from asyncio import get_running_loop
+from contextlib import contextmanager
+from contextvars import ContextVar
+from heapq import heappop
+from heapq import heappush
+from itertools import count
+from re import compile
+from time import monotonic
+from typing import Hashable
+from typing import Iterator
+from typing import Optional
+
+_ID_SEGMENT = compile(r"/\d+(?=/|$)")
+_priority: ContextVar[int] = ContextVar("projz_request_priority", default=0)
+
+
+def endpoint_template(endpoint: str) -> str:
+    return _ID_SEGMENT.sub("/{id}", endpoint.split("?", 1)[0])
+
+
+class _TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated_at", "penalty_rate", "penalized_at", "waiters", "timer")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = monotonic()
+        self.penalty_rate: Optional[float] = None
+        self.penalized_at = 0.0
+        self.waiters: list[tuple[int, int, Future]] = []
+        self.timer: Optional[TimerHandle] = None
+
+    def current_rate(self, now: float, recovery_time: float) -> float:
+        if self.penalty_rate is None: return self.rate
+        # After a throttle signal the rate climbs back linearly to the configured one within recovery_time.
+        progress = (now - self.penalized_at) / recovery_time if recovery_time > 0 else 1
+        if progress >= 1:
+            self.penalty_rate = None
+            return self.rate
+        return self.penalty_rate + (self.rate - self.penalty_rate) * progress
+
+    def refill(self, now: float, recovery_time: float) -> float:
+        rate = self.current_rate(now, recovery_time)
+        if now > self.updated_at:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * rate)
+            self.updated_at = now
+        return rate
+
+
+class RateLimiter:
+    DEFAULT_LIMITS = {
+        "/v1/chat/threads/{id}/messages": (5, 10),
+        "/v1/users/membership/{id}": (1, 3),
+        "POST /v1/qivotes": (0.5, 2),
+        "POST /biz/v1/gift-boxes": (0.2, 1),
+        "POST /biz/v1/gift-boxes/{id}/claim": (1, 2)
+    }
+
+    def __init__(
+        self,
+        limits: Optional[dict[str, tuple[float, float]]] = None,
+        default_limit: Optional[tuple[float, float]] = None,
+        throttled_limit: tuple[float, float] = (5, 10),
+        backoff_ratio: float = 0.5,
+        min_rate_ratio: float = 0.1,
+        recovery_time: float = 60
+    ):
+        self.limits = {**self.DEFAULT_LIMITS, **(limits or {})}
+        self.default_limit = default_limit
+        self.throttled_limit = throttled_limit
+        self.backoff_ratio = backoff_ratio
+        self.min_rate_ratio = min_rate_ratio
+        self.recovery_time = recovery_time
+        self.buckets: dict[tuple[Hashable, str], _TokenBucket] = {}
+        self.acquired = 0
+        self.waited = 0
+        self.wait_time = 0.0
+        self.throttled = 0
+        self._order = count()
+
+    @staticmethod
+    @contextmanager
+    def priority(value: int) -> Iterator[None]:
+        token = _priority.set(value)
+        try: yield
+        finally: _priority.reset(token)
+
+    def _rule(self, method: str, template: str) -> Optional[str]:
+        key = f"{method} {template}"
+        if key in self.limits: return key
+        if template in self.limits: return template
+        return None
+
+    def _bucket(self, account: Hashable, method: str, endpoint: str, throttled: bool = False) -> Optional[_TokenBucket]:
+        template = endpoint_template(endpoint)
+        rule = self._rule(method, template)
+        limit = self.limits[rule] if rule is not None else self.default_limit
+        if limit is None:
+            # An endpoint without a limit gets one after the server throttled it, its bucket is looked up from then on.
+            bucket = self.buckets.get((account, template))
+            if bucket is not None or not throttled: return bucket
+            limit = self.throttled_limit
+        # A bucket is shared by all endpoints of one rule, "/v1/users/membership/{id}" limits the follows together.
+        key = (account, rule or template)
+        bucket = self.buckets.get(key)
+        if bucket is None: bucket = self.buckets[key] = _TokenBucket(*limit)
+        return bucket
+
+    async def acquire(self, account: Hashable, method: str, endpoint: str, priority: Optional[int] = None) -> None:
+        bucket = self._bucket(account, method, endpoint)
+        if bucket is None: return
+        self.acquired += 1
+        now = monotonic()
+        bucket.refill(now, self.recovery_time)
+        if not bucket.waiters and bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return
+        # Higher priorities are served first, callers with the same priority in order of arrival.
+        future = get_running_loop().create_future()
+        heappush(bucket.waiters, (-(priority if priority is not None else _priority.get()), next(self._order), future))
+        self._schedule(bucket)
+        self.waited += 1
+        try: await future
+        except CancelledError:
+            if future.done() and not future.cancelled():
+                # The token was already handed over, the next waiter gets it instead.
+                bucket.tokens += 1
+                self._wake(bucket)
+            raise
+        finally: self.wait_time += monotonic() - now
+
+    def _schedule(self, bucket: _TokenBucket) -> None:
+        if bucket.timer is not None or not bucket.waiters: return
+        rate = bucket.current_rate(monotonic(), self.recovery_time)
+        delay = max(0.0, (1 - bucket.tokens) / rate) if rate > 0 else self.recovery_time
+        bucket.timer = get_running_loop().call_later(delay, self._wake, bucket)
+
+    def _wake(self, bucket: _TokenBucket) -> None:
+        if bucket.timer is not None:
+            bucket.timer.cancel()
+            bucket.timer = None
+        bucket.refill(monotonic(), self.recovery_time)
+        while bucket.waiters and bucket.tokens >= 1:
+            _, _, future = heappop(bucket.waiters)
+            if future.done(): continue
+            bucket.tokens -= 1
+            future.set_result(None)
+        while bucket.waiters and bucket.waiters[0][2].done(): heappop(bucket.waiters)
+        self._schedule(bucket)
+
+    def penalize(self, account: Hashable, method: str, endpoint: str) -> None:
+        bucket = self._bucket(account, method, endpoint, True)
+        self.throttled += 1
+        now = monotonic()
+        rate = bucket.refill(now, self.recovery_time)
+        bucket.penalty_rate = max(rate * self.backoff_ratio, bucket.rate * self.min_rate_ratio)
+        bucket.penalized_at = now
+        # The burst that tripped the server is not repeated, the queue drains at the reduced rate.
+        bucket.tokens = min(bucket.tokens, 0.0)
+        if bucket.timer is not None:
+            bucket.timer.cancel()
+            bucket.timer = None
+        self._schedule(bucket)
+
+    def stats(self) -> dict:
+        now = monotonic()
+        return {
+            "buckets": len(self.buckets),
+            "acquired": self.acquired,
+            "waited": self.waited,
+            "wait_time": self.wait_time,
+            "throttled": self.throttled,
+            "waiting": sum(len(bucket.waiters) for bucket in self.buckets.values()),
+            "penalized": sum(
+                1 for bucket in self.buckets.values()
+                if bucket.penalty_rate is not None and bucket.current_rate(now, self.recovery_time) < bucket.rate
+            )
+        }
@@ -0,0 +1,95 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Hashable
+from typing import Optional
+
+
+class ResponseCache:
+    DEFAULT_TTL = {
+        "user": 60,
+        "chat": 30,
+        "circle": 300,
+        "blog": 60,
+        "link": 3600
+    }
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[dict[str, float]] = None, default_ttl: float = 60):
+        self.max_size = max_size
+        self.ttl = {**self.DEFAULT_TTL, **(ttl or {})}
+        self.default_ttl = default_ttl
+        self.entries: OrderedDict[Hashable, tuple[float, str, dict]] = OrderedDict()
+        self.paths: dict[str, set[Hashable]] = {}
+        # Every invalidation gets a new generation. A response is only stored when its path was not invalidated
+        # after the request started, so an answer that was already on its way can't bring back the old state.
+        self.generation = 0
+        self.invalidations: OrderedDict[str, int] = OrderedDict()
+        self.forgotten_generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[dict]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, path, value = entry
+        if expires_at <= monotonic():
+            self._remove(key, path)
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, family: str, path: str, key: Hashable, value: dict, generation: Optional[int] = None) -> None:
+        ttl = self.ttl.get(family, self.default_ttl)
+        if ttl <= 0: return
+        if generation is not None and self._invalidated_since(path, generation): return
+        if key in self.entries: self._remove(key, self.entries[key][1])
+        self.entries[key] = (monotonic() + ttl, path, value)
+        self.paths.setdefault(path, set()).add(key)
+        while len(self.entries) > self.max_size:
+            evicted_key, (_, evicted_path, _) = self.entries.popitem(last=False)
+            self._forget_path(evicted_key, evicted_path)
+            self.evictions += 1
+
+    def invalidate(self, path: str) -> int:
+        self.generation += 1
+        self.invalidations[path] = self.generation
+        self.invalidations.move_to_end(path)
+        # Only the latest invalidations are remembered, older requests are treated as if their path was invalidated.
+        while len(self.invalidations) > self.max_size:
+            _, self.forgotten_generation = self.invalidations.popitem(last=False)
+        keys = self.paths.pop(path, set())
+        for key in keys: self.entries.pop(key, None)
+        return len(keys)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.paths.clear()
+        self.generation += 1
+        self.invalidations.clear()
+        self.forgotten_generation = self.generation
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+    def _invalidated_since(self, path: str, generation: int) -> bool:
+        if generation < self.forgotten_generation: return True
+        return self.invalidations.get(path, 0) > generation
+
+    def _remove(self, key: Hashable, path: str) -> None:
+        self.entries.pop(key, None)
+        self._forget_path(key, path)
+
+    def _forget_path(self, key: Hashable, path: str) -> None:
+        keys = self.paths.get(path)
+        if keys is None: return
+        keys.discard(key)
+        if not keys: del self.paths[path]
@@ -0,0 +1,85 @@
+from ...error import ApiException
+from ...error import BadResponse
+from ...error import TooManyRequests
+from aiohttp import ClientConnectionError
+from aiohttp import ClientPayloadError
+from asyncio import TimeoutError
+from asyncio import sleep
+from asyncio import wait_for
+from random import uniform
+from time import monotonic
+from typing import Awaitable
+from typing import Callable
+from typing import Iterable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class RetryPolicy:
+    RETRYABLE_EXCEPTIONS = (ClientConnectionError, ClientPayloadError, TimeoutError, BadResponse)
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.05,
+        max_delay: float = 2,
+        deadline: float = 10,
+        budget_ratio: float = 0.1,
+        retry_budget: float = 10,
+        retryable_codes: Iterable[int] = ()
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.budget_ratio = budget_ratio
+        self.retry_budget = retry_budget
+        self.retryable_codes = frozenset(retryable_codes)
+        # Every success earns budget_ratio of a retry, so retries stay a small share of the traffic during an outage.
+        self.budget = float(retry_budget)
+        self.retries = 0
+        self.budget_exhausted = 0
+
+    def is_retryable(self, exception: BaseException) -> bool:
+        # The server asked to slow down, the rate limiter handles it instead of an immediate second request.
+        if isinstance(exception, TooManyRequests): return False
+        if isinstance(exception, self.RETRYABLE_EXCEPTIONS): return True
+        if isinstance(exception, ApiException):
+            # Codes with their own class in ApiException.errors are answers about the request itself, not hiccups.
+            return exception.code in self.retryable_codes and exception.code not in ApiException.errors
+        return False
+
+    def _withdraw(self) -> bool:
+        if self.budget < 1:
+            self.budget_exhausted += 1
+            return False
+        self.budget -= 1
+        return True
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        started_at = monotonic()
+        delay = self.base_delay
+        attempt = 1
+        while True:
+            try:
+                # A hung attempt is cut off at the deadline of the whole call, its timeout is retried while time is left.
+                result = await wait_for(call(), self.deadline - (monotonic() - started_at))
+            except Exception as e:
+                if attempt >= self.max_attempts or not self.is_retryable(e): raise
+                # Decorrelated jitter: the next delay is drawn between the base delay and three times the previous one.
+                delay = min(self.max_delay, uniform(self.base_delay, delay * 3))
+                if monotonic() - started_at + delay > self.deadline or not self._withdraw(): raise
+                self.retries += 1
+                attempt += 1
+                await sleep(delay)
+                continue
+            self.budget = min(self.retry_budget, self.budget + self.budget_ratio)
+            return result
+
+    def stats(self) -> dict:
+        return {
+            "retries": self.retries,
+            "budget": self.budget,
+            "budget_exhausted": self.budget_exhausted
+        }
@@ -0,0 +1,37 @@
+from asyncio import Task
+from asyncio import create_task
+from asyncio import shield
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Hashable
+
+
+class SingleFlight:
+    def __init__(self):
+        self.in_flight: dict[Hashable, Task] = {}
+        self.requests = 0
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        self.requests += 1
+        task = self.in_flight.get(key)
+        if task is None:
+            task = create_task(factory())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda done: self._complete(key, done))
+        else:
+            self.coalesced += 1
+        # The shared task must survive the cancellation of any single caller.
+        return await shield(task)
+
+    def _complete(self, key: Hashable, task: Task) -> None:
+        if self.in_flight.get(key) is task: del self.in_flight[key]
+        if not task.cancelled(): task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "in_flight": len(self.in_flight)
+        }
@@ -1,24 +1,37 @@
 from .api import RequestManager
+from .api.util import MultipartFileStream
 from .api.headers import IHeadersProvider
 from .api.headers import HeadersProvider
 from .model import *
 from .enum import *
 from .websocket import WebsocketListener
+from .util import PageIterator
+from .util import HandlerPool
+from .util import gather_offset_pages
 from typing import Union
 from typing import Callable
 from typing import Any
-from aiohttp import MultipartWriter
 from typing import Optional
 from aiofiles.threadpool.binary import AsyncBufferedReader
 from random import randint
 from sys import maxsize
+from time import time
+from asyncio import wait_for
+from asyncio import TimeoutError
 from urllib.parse import urlparse
-from magic import from_buffer
 from mnemonic import Mnemonic
 from bip32utils import BIP32Key
 
 CircleReference = Union[Circle, str, int]
 
+# Cached lookups of the objects an item id can refer to.
+_OBJECT_PATHS = {
+    EObjectType.CHAT.value: "/v1/chat/threads/{}",
+    EObjectType.BLOG.value: "/v1/blogs/{}",
+    EObjectType.USER.value: "/v1/users/profile/{}",
+    EObjectType.CIRCLE.value: "/v1/circles/{}"
+}
+
 
 class Client(RequestManager):
     def __init__(
@@ -28,14 +41,36 @@ class Client(RequestManager):
         http_logging: bool = False,
         ws_logging: bool = False,
         *args,
+        handler_pool: Optional[HandlerPool] = None,
+        identity_map: Optional[IdentityMap] = None,
         **kwargs
     ):
         super().__init__(provider or HeadersProvider(), logging=http_logging, *args, **kwargs)
-        self.websocket = WebsocketListener(self, logging=ws_logging)
+        self.websocket = WebsocketListener(
+            self,
+            logging=ws_logging,
+            handler_pool=handler_pool,
+            backfill=self.get_chat_messages
+        )
         self.commands_prefix = commands_prefix
+        self.identity_map = identity_map
         self.account = None
         self.user_profile = None
 
+    def _decode(self, cls: type, data: dict):
+        if self.identity_map is None: return cls.from_dict(data)
+        # Users, media, circles and chats decoded while the map is active are shared by their ids.
+        with self.identity_map.active(): return cls.from_dict(data)
+
+    def invalidate_cache(self, *paths: str) -> None:
+        """
+        Drop the cached responses of the paths, the shared instances of the identity map are dropped as well
+        :param paths: paths of the objects without the query
+        :return:
+        """
+        super().invalidate_cache(*paths)
+        if self.identity_map is not None: self.identity_map.clear()
+
     async def _logout(self):
         self.provider.remove_sid()
         await self.websocket.disconnect()
@@ -75,7 +110,7 @@ class Client(RequestManager):
             data["secret"] = secret
             data["authType"] = EAuthType.SECRET.value
             data["purpose"] = EAuthPurpose.RENEW_SID.value
-        resp = AuthResult.from_dict(await self.post_json("/v1/auth/login", data))
+        resp = self._decode(AuthResult, await self.post_json("/v1/auth/login", data))
         await self._auth(resp)
         return resp
 
@@ -113,6 +148,21 @@ class Client(RequestManager):
         await self.post_empty("/v1/auth/logout")
         await self._logout()
 
+    async def aclose(self) -> None:
+        """
+        Close the websocket connection, the handler pool and the pooled HTTP sessions
+        :return:
+        """
+        if self.websocket.connection is not None: await self.websocket.disconnect()
+        if self.websocket.handler_pool is not None: await self.websocket.handler_pool.aclose()
+        await super().aclose()
+
+    async def __aenter__(self) -> "Client":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
     async def _request_security_validation(
         self,
         email: Optional[str],
@@ -336,6 +386,7 @@ class Client(RequestManager):
         :return:
         """
         await self.post_empty(f"/v1/chat/threads/{thread_id}/accept-invitation")
+        self.invalidate_cache(f"/v1/chat/threads/{thread_id}")
 
     async def join_circle(self, reference: CircleReference) -> None:
         """
@@ -343,7 +394,9 @@ class Client(RequestManager):
         :param reference: circle id | circle link | z id
         :return:
         """
-        await self.post_empty(f"/v1/circles/{await self._resolve_circle_reference(reference)}/members")
+        circle_id = await self._resolve_circle_reference(reference)
+        await self.post_empty(f"/v1/circles/{circle_id}/members")
+        self.invalidate_cache(f"/v1/circles/{circle_id}")
 
     async def leave_circle(self, reference: CircleReference) -> None:
         """
@@ -351,7 +404,9 @@ class Client(RequestManager):
         :param reference: circle id | circle link | z id
         :return:
         """
-        await self.delete(f"/v1/circles/{await self._resolve_circle_reference(reference)}/members")
+        circle_id = await self._resolve_circle_reference(reference)
+        await self.delete(f"/v1/circles/{circle_id}/members")
+        self.invalidate_cache(f"/v1/circles/{circle_id}")
 
     async def join_chat(self, thread_id: int) -> None:
         """
@@ -360,6 +415,7 @@ class Client(RequestManager):
         :return:
         """
         await self.post_empty(f"/v1/chat/threads/{thread_id}/members")
+        self.invalidate_cache(f"/v1/chat/threads/{thread_id}")
 
     async def leave_chat(self, thread_id: int) -> None:
         """
@@ -368,6 +424,7 @@ class Client(RequestManager):
         :return:
         """
         await self.delete(f"/v1/chat/threads/{thread_id}/members")
+        self.invalidate_cache(f"/v1/chat/threads/{thread_id}")
 
     async def get_chat_message(self, thread_id: int, message_id: int) -> ChatMessage:
         """
@@ -376,7 +433,10 @@ class Client(RequestManager):
         :param message_id: id of the message
         :return: model.ChatMessage
         """
-        return ChatMessage.from_dict(await self.get(f"/v1/chat/threads/{thread_id}/messages/{message_id}"))
+        return self._decode(ChatMessage, await self.get(
+            f"/v1/chat/threads/{thread_id}/messages/{message_id}",
+            hedge=True
+        ))
 
     async def get_chat_messages(self, thread_id: int, size: int = 30, page_token: Optional[str] = None) -> PaginatedList[ChatMessage]:
         """
@@ -393,10 +453,32 @@ class Client(RequestManager):
             "pageToken": page_token
         })
         return PaginatedList(
-            [ChatMessage.from_dict(message_json) for message_json in resp["list"]],
+            [self._decode(ChatMessage, message_json) for message_json in resp["list"]],
             resp.get("pagination")
         )
 
+    def iter_chat_messages(
+        self,
+        thread_id: int,
+        size: int = 30,
+        *,
+        prefetch: int = 1,
+        max_items: Optional[int] = None
+    ) -> PageIterator[ChatMessage]:
+        """
+        Iterate over the messages in the chat, fetching the next pages in the background
+        :param thread_id: id of the chat
+        :param size: size of the pages
+        :param prefetch: how many pages can be fetched ahead of the consumer
+        :param max_items: stop after this many messages
+        :return: PageIterator[model.ChatMessage]
+        """
+        return PageIterator(
+            lambda page_token: self.get_chat_messages(thread_id, size, page_token),
+            prefetch,
+            max_items
+        )
+
     async def send_message(self,
                            thread_id: int,
                            message_type: Union[EChatMessageType, int] = 1,
@@ -408,7 +490,8 @@ class Client(RequestManager):
                            poll_id: Optional[int] = None,
                            dice_id: Optional[int] = None,
                            *,
-                           get_sent_message: bool = True) -> Optional[ChatMessage]:
+                           get_sent_message: bool = True,
+                           echo_timeout: float = 2) -> Optional[ChatMessage]:
         """
         Send message to the chat
         :param thread_id: id of the chat
@@ -420,9 +503,11 @@ class Client(RequestManager):
         :param attached_audio: attached to the message audio model.Media object
         :param poll_id: attached to the message poll id
         :param dice_id: attached to the message dice id
-        :param get_sent_message: If set to False, the request for information about the
-        sent message will not be executed and the function will return None.
-        :return:
+        :param get_sent_message: If set to False, the function will return None
+        instead of the sent message.
+        :param echo_timeout: how long to wait for the websocket echo of a message with a poll or dice
+        before requesting it over HTTP
+        :return: model.ChatMessage | None
         """
         if attached_media is not None and attached_audio is not None:
             raise ValueError("You can't send audio and media in one message")
@@ -441,9 +526,28 @@ class Client(RequestManager):
         if attached_audio is not None: data["media"] = attached_audio.to_dict()
         if poll_id is not None: data["extensions"]["pollId"] = poll_id
         if dice_id is not None: data["extensions"]["diceId"] = dice_id
-        resp = await self.websocket.send_request(1, True, seq_id, **dict(threadId=thread_id, msg=data))
-        if get_sent_message:
-            return await self.get_chat_message(resp["threadId"], resp["messageId"])
+        if not get_sent_message:
+            await self.websocket.send_request(1, True, seq_id, **dict(threadId=thread_id, msg=data))
+            return None
+        # The server echoes the message back over the websocket, so it usually arrives together with the ACK.
+        echo = self.websocket.expect_echo(seq_id)
+        try:
+            resp = await self.websocket.send_request(1, True, seq_id, **dict(threadId=thread_id, msg=data))
+            if echo.done(): return echo.result().decode()
+            if poll_id is None and dice_id is None:
+                # Everything except the ids and the time is known locally, polls and dice are only known by the server.
+                message = self._decode(ChatMessage, {
+                    **data,
+                    "threadId": resp.get("threadId", thread_id),
+                    "messageId": resp["messageId"],
+                    "createdTime": resp.get("createdTime") or int(time())
+                })
+                message.author = self.user_profile
+                return message
+            try: return (await wait_for(echo, echo_timeout)).decode()
+            except TimeoutError: return await self.get_chat_message(resp.get("threadId", thread_id), resp["messageId"])
+        finally:
+            self.websocket.forget_echo(seq_id)
 
     async def show_typing(self, thread_id: int) -> None:
         """
@@ -454,7 +558,7 @@ class Client(RequestManager):
         await self.send_message(thread_id, EChatMessageType.TYPING, get_sent_message=False)
 
     async def get_block_users_info(self) -> BlockUsersInfo:
-        return BlockUsersInfo.from_dict(await self.get("/v1/users/block-uids"))
+        return self._decode(BlockUsersInfo, await self.get("/v1/users/block-uids"))
 
     async def get_link_info(self, link: str) -> LinkInfo:
         """
@@ -462,7 +566,13 @@ class Client(RequestManager):
         :param link: object link
         :return: model.LinkInfo
         """
-        return LinkInfo.from_dict(await self.post_json("/v1/links/path", {"link": link}))
+        return self._decode(LinkInfo, await self.post_json(
+            "/v1/links/path",
+            {"link": link},
+            cache_family="link",
+            idempotent=True,
+            hedge=True
+        ))
 
     async def parse_share_link(self, link: str) -> LinkInfo:
         """
@@ -470,8 +580,9 @@ class Client(RequestManager):
         :param link: object link
         :return: model.LinkInfo
         """
-        return LinkInfo.from_dict(
-            await self.post_json("/v1/parse-share-link", {"link": urlparse(link).path}, web=True)
+        return self._decode(
+            LinkInfo,
+            await self.post_json("/v1/parse-share-link", {"link": urlparse(link).path}, web=True, idempotent=True)
         )
 
     async def get_circle_info(self, circle_id: int) -> Circle:
@@ -480,7 +591,7 @@ class Client(RequestManager):
         :param circle_id: id of the circle
         :return: model.Circle
         """
-        return Circle.from_dict(await self.get(f"/v1/circles/{circle_id}"))
+        return self._decode(Circle, await self.get(f"/v1/circles/{circle_id}", cache_family="circle"))
 
     async def get_chat_info(self, thread_id: int) -> Chat:
         """
@@ -488,7 +599,7 @@ class Client(RequestManager):
         :param thread_id: id of the chat
         :return:
         """
-        return Chat.from_dict(await self.get(f"/v1/chat/threads/{thread_id}"))
+        return self._decode(Chat, await self.get(f"/v1/chat/threads/{thread_id}", cache_family="chat"))
 
     async def get_default_background_media_list(self) -> list[DefaultBackgroundMedia]:
         """
@@ -496,7 +607,7 @@ class Client(RequestManager):
         :return: list[model.DefaultBackgroundMedia]
         """
         return [
-            DefaultBackgroundMedia.from_dict(media_json)
+            self._decode(DefaultBackgroundMedia, media_json)
             for media_json in await self.get("/v1/media/default-background-media-info-list")
         ]
 
@@ -542,7 +653,7 @@ class Client(RequestManager):
         if tag_string_list is not None: data["tagStrList"] = tag_string_list
         if category_id is not None: data["categoryId"] = category_id
         if language is not None: data["language"] = language
-        return Chat.from_dict(await self.post_json("/v1/chat/threads", data))
+        return self._decode(Chat, await self.post_json("/v1/chat/threads", data))
 
     async def get_circle_active_members(self,
                                         reference: CircleReference,
@@ -560,17 +671,40 @@ class Client(RequestManager):
             {"size": size} if page_token is None else {"pageToken": page_token, "size": size}
         )
         return PaginatedList(
-            [User.from_dict(user_json) for user_json in resp["list"]],
+            [self._decode(User, user_json) for user_json in resp["list"]],
             resp.get("pagination")
         )
 
+    def iter_circle_active_members(
+        self,
+        reference: CircleReference,
+        size: int = 30,
+        *,
+        prefetch: int = 1,
+        max_items: Optional[int] = None
+    ) -> PageIterator[User]:
+        """
+        Iterate over the active members in the circle, fetching the next pages in the background
+        :param reference: circle id | circle link | z id
+        :param size: size of the pages
+        :param prefetch: how many pages can be fetched ahead of the consumer
+        :param max_items: stop after this many members
+        :return: PageIterator[model.User]
+        """
+        async def fetch(page_token: Optional[str]) -> PaginatedList[User]:
+            nonlocal reference
+            reference = await self._resolve_circle_reference(reference)
+            return await self.get_circle_active_members(reference, size, page_token)
+
+        return PageIterator(fetch, prefetch, max_items)
+
     async def get_chat_with_user(self, user_id: int) -> Chat:
         """
         Try to get a one-on-one chat with another user
         :param user_id: id of the user
         :return:
         """
-        return Chat.from_dict(await self.get(f"/v1/chat/one-on-one-chat/{user_id}"))
+        return self._decode(Chat, await self.get(f"/v1/chat/one-on-one-chat/{user_id}"))
 
     async def get_recommended_user_namecards(self, size: int = 100, gender_type: Union[EGender, int] = 0) -> list[User]:
         """
@@ -585,7 +719,7 @@ class Client(RequestManager):
             "withoutExtraInfo": True
         })
         return [
-            User.from_dict(user_json)
+            self._decode(User, user_json)
             for user_json in resp["list"]
         ]
 
@@ -595,7 +729,11 @@ class Client(RequestManager):
         :param user_id: id of the user
         :return: model.User
         """
-        return User.from_dict(await self.get(f"/v1/users/profile/{user_id}"))
+        return self._decode(User, await self.get(
+            f"/v1/users/profile/{user_id}",
+            cache_family="user",
+            hedge=True
+        ))
 
     async def delete_chat(self, chat_id: int) -> None:
         """
@@ -604,6 +742,7 @@ class Client(RequestManager):
         :return:
         """
         await self.delete(f"/v1/chat/threads/{chat_id}")
+        self.invalidate_cache(f"/v1/chat/threads/{chat_id}")
 
     async def get_circle_chats(
         self,
@@ -638,7 +777,7 @@ class Client(RequestManager):
             "pageToken": page_token
         })
         return PaginatedList(
-            [Chat.from_dict(user_json) for user_json in resp["list"]],
+            [self._decode(Chat, user_json) for user_json in resp["list"]],
             resp.get("pagination")
         )
 
@@ -661,10 +800,34 @@ class Client(RequestManager):
             "size": size,
         })
         return [
-            Chat.from_dict(chat_json)
+            self._decode(Chat, chat_json)
             for chat_json in resp["list"]
         ]
 
+    async def get_all_joined_chats(
+        self,
+        query_type: Union[EChatQueryType, int] = EChatQueryType.PRIVATE,
+        size: int = 30,
+        *,
+        concurrency: int = 4,
+        max_items: Optional[int] = None
+    ) -> list[Chat]:
+        """
+        Get the whole list of chats that an account has joined, fetching several windows at once
+        :param query_type: ChatQueryType enum field or type identifier (default: private)
+        :param size: size of the windows
+        :param concurrency: how many windows can be fetched at the same time
+        :param max_items: stop after this many chats
+        :return: list[Chat]
+        """
+        return await gather_offset_pages(
+            lambda start, window_size: self.get_joined_chats(start, window_size, query_type),
+            size,
+            concurrency,
+            key=lambda chat: chat.thread_id,
+            max_items=max_items
+        )
+
     async def get_joined_parties(self, start: int = 0, size: int = 30) -> list[Party]:
         """
         Get a list of public chats that an account has joined
@@ -678,17 +841,38 @@ class Client(RequestManager):
             "size": size
         })
         return [
-            Party.from_dict(party_json)
+            self._decode(Party, party_json)
             for party_json in resp["list"]
         ]
 
+    async def get_all_joined_parties(
+        self,
+        size: int = 30,
+        *,
+        concurrency: int = 4,
+        max_items: Optional[int] = None
+    ) -> list[Party]:
+        """
+        Get the whole list of public chats that an account has joined, fetching several windows at once
+        :param size: size of the windows
+        :param concurrency: how many windows can be fetched at the same time
+        :param max_items: stop after this many parties
+        :return: list[Party]
+        """
+        return await gather_offset_pages(
+            lambda start, window_size: self.get_joined_parties(start, window_size),
+            size,
+            concurrency,
+            max_items=max_items
+        )
+
     async def get_qi_votes_info(self, object_id: int) -> QiVoteFullInfo:
         """
         Get qi votes info
         :param object_id: id of the object
         :return: model.QiVoteFullInfo
         """
-        return QiVoteFullInfo.from_dict(await self.get("/v1/qivotes", {
+        return self._decode(QiVoteFullInfo, await self.get("/v1/qivotes", {
             "objectId": object_id,
             "timezone": self.time_zone
         }))
@@ -701,7 +885,7 @@ class Client(RequestManager):
         :param count: qi count
         :return: model.QiVoteInfo
         """
-        return QiVoteInfo.from_dict(await self.post_json("/v1/qivotes", {
+        return self._decode(QiVoteInfo, await self.post_json("/v1/qivotes", {
             "objectType": target_type if isinstance(target_type, int) else target_type.value,
             "objectId": object_id,
             "votedCount": count,
@@ -720,7 +904,7 @@ class Client(RequestManager):
             {"onlyCoHosts": only_co_hosts}
         )
         return [
-            User.from_dict(user_json)
+            self._decode(User, user_json)
             for user_json in resp["list"]
         ]
 
@@ -755,10 +939,45 @@ class Client(RequestManager):
             "pageToken": page_token
         })
         return PaginatedList(
-            [User.from_dict(user_json) for user_json in resp["list"]],
+            [self._decode(User, user_json) for user_json in resp["list"]],
             resp.get("pagination")
         )
 
+    def iter_chat_members(
+        self,
+        chat_id: int,
+        size: int = 30,
+        query_word: str = "",
+        *,
+        only_active_members: bool = False,
+        exclude_managers: bool = False,
+        prefetch: int = 1,
+        max_items: Optional[int] = None
+    ) -> PageIterator[User]:
+        """
+        Iterate over the chat members, fetching the next pages in the background
+        :param chat_id: id of the chat
+        :param size: size of the pages
+        :param query_word: search query
+        :param only_active_members: include only active members
+        :param exclude_managers: exclude management team
+        :param prefetch: how many pages can be fetched ahead of the consumer
+        :param max_items: stop after this many members
+        :return: PageIterator[model.User]
+        """
+        return PageIterator(
+            lambda page_token: self.get_chat_members(
+                chat_id,
+                size,
+                query_word,
+                page_token,
+                only_active_members=only_active_members,
+                exclude_managers=exclude_managers
+            ),
+            prefetch,
+            max_items
+        )
+
     async def get_circle_members(self,
                                  reference: CircleReference,
                                  size: int = 30,
@@ -786,10 +1005,37 @@ class Client(RequestManager):
             "pageToken": page_token
         })
         return PaginatedList(
-            [User.from_dict(user_json) for user_json in resp["list"]],
+            [self._decode(User, user_json) for user_json in resp["list"]],
             resp.get("pagination")
         )
 
+    def iter_circle_members(
+        self,
+        reference: CircleReference,
+        size: int = 30,
+        query_type: ECircleMembersQueryType = ECircleMembersQueryType.NORMAL,
+        *,
+        exclude_managers: bool = False,
+        prefetch: int = 1,
+        max_items: Optional[int] = None
+    ) -> PageIterator[User]:
+        """
+        Iterate over the circle members, fetching the next pages in the background
+        :param reference: circle id | circle link | z id
+        :param size: size of the pages
+        :param query_type: CircleMembersQueryType.NORMAL | CircleMembersQueryType.BLOCKED
+        :param exclude_managers: exclude management team
+        :param prefetch: how many pages can be fetched ahead of the consumer
+        :param max_items: stop after this many members
+        :return: PageIterator[model.User]
+        """
+        async def fetch(page_token: Optional[str]) -> PaginatedList[User]:
+            nonlocal reference
+            reference = await self._resolve_circle_reference(reference)
+            return await self.get_circle_members(reference, size, query_type, page_token, exclude_managers=exclude_managers)
+
+        return PageIterator(fetch, prefetch, max_items)
+
     async def get_visible_member_titles(self, reference: CircleReference, size: int = 100) -> MemberTitlesInfo:
         """
         Get info about member title in specified circle
@@ -797,7 +1043,7 @@ class Client(RequestManager):
         :param size: size of the list
         :return: model.MemberTitlesInfo
         """
-        return MemberTitlesInfo.from_dict(await self.get(f"/v1/circles/{await self._resolve_circle_reference(reference)}"
+        return self._decode(MemberTitlesInfo, await self.get(f"/v1/circles/{await self._resolve_circle_reference(reference)}"
                                                          f"/visible-member-titles", {"size": size}))
 
     async def create_poll_with_icons(
@@ -815,7 +1061,7 @@ class Client(RequestManager):
             lambda x: (x[0], x[1].to_dict()) if isinstance(x[1], Media) else x,
             poll_items
         ))
-        return Poll.from_dict(await self.post_json("/v1/polls", {
+        return self._decode(Poll, await self.post_json("/v1/polls", {
             "title": title,
             "pollItemList": [
                 {"content": item[0]} if len(item) != 2 or item[1] is None else
@@ -838,7 +1084,7 @@ class Client(RequestManager):
             "contentRegion": target_region if isinstance(target_region, int) else target_region.value
         })
         return [
-            Category.from_dict(category_json)
+            self._decode(Category, category_json)
             for category_json in resp["list"]
         ]
 
@@ -866,10 +1112,34 @@ class Client(RequestManager):
             "pageToken": page_token
         })
         return PaginatedList(
-            [Circle.from_dict(circle_json) for circle_json in resp["list"]],
+            [self._decode(Circle, circle_json) for circle_json in resp["list"]],
             resp.get("pagination")
         )
 
+    def iter_circles(
+        self,
+        filter_type: Union[ECircleFilterType, str],
+        size: int = 30,
+        category_id: int = 0,
+        *,
+        prefetch: int = 1,
+        max_items: Optional[int] = None
+    ) -> PageIterator[Circle]:
+        """
+        Iterate over the circles attached to specified category, fetching the next pages in the background
+        :param filter_type: CircleFilterType enum field or filter identifier
+        :param size: size of the pages
+        :param category_id: id of the category, 0 for all categories
+        :param prefetch: how many pages can be fetched ahead of the consumer
+        :param max_items: stop after this many circles
+        :return: PageIterator[model.Circle]
+        """
+        return PageIterator(
+            lambda page_token: self.get_circles(filter_type, size, category_id, page_token),
+            prefetch,
+            max_items
+        )
+
     async def visit_profile(self, user_id: int) -> None:
         """
         Visit user profile
@@ -884,7 +1154,7 @@ class Client(RequestManager):
         :param blog_id: id of the blog
         :return: model.Blog
         """
-        return Blog.from_dict(await self.get(f"/v1/blogs/{blog_id}"))
+        return self._decode(Blog, await self.get(f"/v1/blogs/{blog_id}", cache_family="blog"))
 
     async def post_blog(self,
                         title: str,
@@ -921,7 +1191,7 @@ class Client(RequestManager):
         if background is not None: data["background"] = background.to_dict()
         if cover is not None: data["cover"] = cover.to_dict()
         if background_color is not None: data["extensions"]["backgroundColor"] = background_color
-        return Blog.from_dict(await self.post_json("/v1/blogs", data))
+        return self._decode(Blog, await self.post_json("/v1/blogs", data))
 
     async def delete_blog(self, blog_id: int) -> None:
         """
@@ -930,6 +1200,7 @@ class Client(RequestManager):
         :return:
         """
         await self.delete(f"/v1/blogs/{blog_id}")
+        self.invalidate_cache(f"/v1/blogs/{blog_id}")
 
     async def get_comment_info(self, comment_id: int) -> Comment:
         """
@@ -937,7 +1208,7 @@ class Client(RequestManager):
         :param comment_id: id of the comment
         :return: model.Comment
         """
-        return Comment.from_dict(await self.get(f"/v1/comments/{comment_id}"))
+        return self._decode(Comment, await self.get(f"/v1/comments/{comment_id}"))
 
     async def delete_comment(self, comment_id: int) -> Comment:
         """
@@ -980,10 +1251,45 @@ class Client(RequestManager):
             "pageToken": page_token
         })
         return PaginatedList(
-            [Comment.from_dict(comment_json) for comment_json in resp["list"]],
+            [self._decode(Comment, comment_json) for comment_json in resp["list"]],
             resp.get("pagination")
         )
 
+    def iter_comments(
+        self,
+        parent_type: Union[EObjectType, int],
+        parent_id: int,
+        size: int = 30,
+        reply_id: int = 0,
+        *,
+        only_pinned: bool = False,
+        prefetch: int = 1,
+        max_items: Optional[int] = None
+    ) -> PageIterator[Comment]:
+        """
+        Iterate over the comments, fetching the next pages in the background
+        :param parent_type: ObjectType enum field or type identifier
+        :param parent_id: id of the parent
+        :param size: size of the pages
+        :param reply_id: include only replies to comment with id reply_id
+        :param only_pinned: include only pinned comments
+        :param prefetch: how many pages can be fetched ahead of the consumer
+        :param max_items: stop after this many comments
+        :return: PageIterator[model.Comment]
+        """
+        return PageIterator(
+            lambda page_token: self.get_comments(
+                parent_type,
+                parent_id,
+                size,
+                reply_id,
+                page_token,
+                only_pinned=only_pinned
+            ),
+            prefetch,
+            max_items
+        )
+
     async def comment(self,
                       parent_type: Union[EObjectType, int],
                       parent_id: int,
@@ -1007,7 +1313,7 @@ class Client(RequestManager):
         }
         if content is not None: data["content"] = content
         if reply_to is not None: data["replyId"] = reply_to
-        return Comment.from_dict(await self.post_json("/v1/comments", data))
+        return self._decode(Comment, await self.post_json("/v1/comments", data))
 
     async def create_poll(self, title: str, poll_items: list[str]) -> Poll:
         """
@@ -1020,7 +1326,7 @@ class Client(RequestManager):
 
     async def get_user_tasks(self) -> list[UserTask]:
         return [
-            UserTask.from_dict(task_json)
+            self._decode(UserTask, task_json)
             for task_json in (await self.get("/v2/user-tasks"))["list"]
         ]
 
@@ -1069,7 +1375,7 @@ class Client(RequestManager):
             "currencyType": sending_currency_type.value,
             "title": title
         })
-        return GiftBox.from_dict(resp)
+        return self._decode(GiftBox, resp)
 
     async def get_transfer_orders(self, size: int = 30, page_token: Optional[str] = None) -> PaginatedList[TransferOrder]:
         """
@@ -1085,10 +1391,26 @@ class Client(RequestManager):
             "pageToken": page_token
         })
         return PaginatedList(
-            [TransferOrder.from_dict(order_json) for order_json in resp["list"]],
+            [self._decode(TransferOrder, order_json) for order_json in resp["list"]],
             resp.get("pagination")
         )
 
+    def iter_transfer_orders(
+        self,
+        size: int = 30,
+        *,
+        prefetch: int = 1,
+        max_items: Optional[int] = None
+    ) -> PageIterator[TransferOrder]:
+        """
+        Iterate over the incoming currency transfers, fetching the next pages in the background
+        :param size: size of the pages
+        :param prefetch: how many pages can be fetched ahead of the consumer
+        :param max_items: stop after this many transfers
+        :return: PageIterator[model.TransferOrder]
+        """
+        return PageIterator(lambda page_token: self.get_transfer_orders(size, page_token), prefetch, max_items)
+
     async def activate_wallet(self, payment_password: str, security_code: str) -> str:
         """
         Activate a wallet
@@ -1116,7 +1438,7 @@ class Client(RequestManager):
         """
         resp = await self.get("/biz/v1/wallet")
         if len(resp) == 0: return None
-        return Wallet.from_dict(resp)
+        return self._decode(Wallet, resp)
 
     async def get_dices(self) -> list[Dice]:
         """
@@ -1124,7 +1446,7 @@ class Client(RequestManager):
         :return list[model.Dice]
         """
         return [
-            Dice.from_dict(dice_json)
+            self._decode(Dice, dice_json)
             for dice_json in (await self.get("/v1/dices"))["diceList"]
         ]
 
@@ -1133,7 +1455,7 @@ class Client(RequestManager):
         Get info about new user invitation code
         :return: model.MultiInvitationCodeInfo
         """
-        return MultiInvitationCodeInfo.from_dict(await self.get("/v1/users/multi-invitation-code"))
+        return self._decode(MultiInvitationCodeInfo, await self.get("/v1/users/multi-invitation-code"))
 
     async def follow(self, user_id: int) -> None:
         """
@@ -1142,6 +1464,7 @@ class Client(RequestManager):
         :return:
         """
         await self.post_empty(f"/v1/users/membership/{user_id}")
+        self.invalidate_cache(f"/v1/users/profile/{user_id}")
 
     async def unfollow(self, user_id: int) -> None:
         """
@@ -1150,6 +1473,7 @@ class Client(RequestManager):
         :return:
         """
         await self.delete(f"/v1/users/membership/{user_id}")
+        self.invalidate_cache(f"/v1/users/profile/{user_id}")
 
     async def get_blocked_items(
         self,
@@ -1172,13 +1496,38 @@ class Client(RequestManager):
         } if page_token is None else {
             "objectType": items_type.value if isinstance(items_type, EObjectType) else items_type,
             "size": size,
-            "page_token": page_token
+            "pageToken": page_token
         })
         return PaginatedList(
-            [BlockedItemWrapper.from_dict(item_json) for item_json in resp["list"]],
+            [self._decode(BlockedItemWrapper, item_json) for item_json in resp["list"]],
             resp.get("pagination")
         )
 
+    def iter_blocked_items(
+        self,
+        reference: CircleReference,
+        items_type: Union[EObjectType, int],
+        size: int = 30,
+        *,
+        prefetch: int = 1,
+        max_items: Optional[int] = None
+    ) -> PageIterator[BlockedItemWrapper]:
+        """
+        Iterate over the blocked items in the circle, fetching the next pages in the background
+        :param reference: circle id | circle link | z id
+        :param items_type: ObjectType enum field or type identifier
+        :param size: size of the pages
+        :param prefetch: how many pages can be fetched ahead of the consumer
+        :param max_items: stop after this many items
+        :return: PageIterator[BlockedItemWrapper]
+        """
+        async def fetch(page_token: Optional[str]) -> PaginatedList[BlockedItemWrapper]:
+            nonlocal reference
+            reference = await self._resolve_circle_reference(reference)
+            return await self.get_blocked_items(reference, items_type, size, page_token)
+
+        return PageIterator(fetch, prefetch, max_items)
+
     async def get_blocked_blogs(
         self,
         reference: CircleReference,
@@ -1231,10 +1580,14 @@ class Client(RequestManager):
         :param item_type: ObjectType enum field or type identifier
         :return:
         """
-        await self.post_json(f"/v1/circles/{await self._resolve_circle_reference(reference)}/blocked-items", {
+        circle_id = await self._resolve_circle_reference(reference)
+        item_type = item_type.value if isinstance(item_type, EObjectType) else item_type
+        await self.post_json(f"/v1/circles/{circle_id}/blocked-items", {
             "objectId": item_id,
-            "objectType": item_type.value if isinstance(item_type, EObjectType) else item_type
+            "objectType": item_type
         })
+        self.invalidate_cache(f"/v1/circles/{circle_id}")
+        if item_type in _OBJECT_PATHS: self.invalidate_cache(_OBJECT_PATHS[item_type].format(item_id))
 
     async def unblock_item(self, reference: CircleReference, item_id: int) -> None:
         """
@@ -1243,7 +1596,10 @@ class Client(RequestManager):
         :param item_id: id of the item
         :return:
         """
-        await self.delete(f"/v1/circles/{await self._resolve_circle_reference(reference)}/blocked-items/{item_id}")
+        circle_id = await self._resolve_circle_reference(reference)
+        await self.delete(f"/v1/circles/{circle_id}/blocked-items/{item_id}")
+        # The type of the item is not known here, so every object it can be is dropped from the cache.
+        self.invalidate_cache(f"/v1/circles/{circle_id}", *(path.format(item_id) for path in _OBJECT_PATHS.values()))
 
     async def change_chat_online_status(self, chat_id: int, *, is_online: bool) -> None:
         """
@@ -1255,6 +1611,7 @@ class Client(RequestManager):
         await self.post_json(f"/v1/chat/threads/{chat_id}/party-online-status", {
             "partyOnlineStatus": 1 if is_online else 2
         })
+        self.invalidate_cache(f"/v1/chat/threads/{chat_id}")
 
     async def remove_circle_member(
         self,
@@ -1272,10 +1629,12 @@ class Client(RequestManager):
         :param remove_content: is it required to remove all content posted by member
         :return:
         """
-        await self.post_json(f"/v1/circles/{await self._resolve_circle_reference(reference)}/members/{member_id}", {
+        circle_id = await self._resolve_circle_reference(reference)
+        await self.post_json(f"/v1/circles/{circle_id}/members/{member_id}", {
             "type": "block" if block_member else "remove",
             "removeContent": remove_content
         })
+        self.invalidate_cache(f"/v1/circles/{circle_id}")
 
     async def kick_circle_member(
         self,
@@ -1316,9 +1675,11 @@ class Client(RequestManager):
         :param member_id: id of the member
         :return:
         """
-        await self.post_json(f"/v1/circles/{await self._resolve_circle_reference(reference)}/members/{member_id}", {
+        circle_id = await self._resolve_circle_reference(reference)
+        await self.post_json(f"/v1/circles/{circle_id}/members/{member_id}", {
             "type": "unblock"
         })
+        self.invalidate_cache(f"/v1/circles/{circle_id}")
 
     async def remove_chat_member(
         self,
@@ -1340,6 +1701,7 @@ class Client(RequestManager):
             "block": block_member,
             "removeContent": remove_content
         })
+        self.invalidate_cache(f"/v1/chat/threads/{chat_id}")
 
     async def kick_chat_member(self, chat_id: int, member_id: int, *, remove_content: bool = False) -> None:
         """
@@ -1371,6 +1733,7 @@ class Client(RequestManager):
         await self.post_json(f"/v1/chat/threads/{chat_id}/members-invite", {
             "invitedUids": [invited_users] if isinstance(invited_users, str) else invited_users
         })
+        self.invalidate_cache(f"/v1/chat/threads/{chat_id}")
 
     async def delete_chat_message(self, chat_id: int, message_id: int) -> None:
         """
@@ -1380,43 +1743,62 @@ class Client(RequestManager):
         :return:
         """
         await self.delete(f"/v1/chat/threads/{chat_id}/messages/{message_id}")
+        self.invalidate_cache(f"/v1/chat/threads/{chat_id}")
 
     async def upload_file(self,
                           file: Union[bytes, AsyncBufferedReader],
                           target: Union[EUploadTarget, int],
                           duration: int = 0,
                           *,
-                          raw_output: bool = False) -> Union[dict, Media]:
+                          raw_output: bool = False,
+                          chunk_size: int = 64 * 1024) -> Union[dict, Media]:
         """
         Upload a file to the Project Z server
         :param file: file object returned by aiofiles.open or raw in-memory byte buffer
         :param target: UploadTarget enum field or int identifier
         :param duration: audio duration in milliseconds or 0
         :param raw_output: is it required to return dictionary object instead of model.Media
+        :param chunk_size: size of the chunks in which the file is read and sent
         :return: dict | model.Media
         """
-        file_content = await file.read() if isinstance(file, AsyncBufferedReader) else file
         target = target if isinstance(target, int) else target.value
-        writer = MultipartWriter()
-        part = writer.append(file_content, {"Content-Type": from_buffer(file_content, mime=True)})
-        part.set_content_disposition(
-            "form-data",
-            name="media",
-            filename=file.name if isinstance(file, AsyncBufferedReader) else "file"
+        stream = MultipartFileStream(
+            file,
+            filename=file.name if isinstance(file, AsyncBufferedReader) else "file",
+            chunk_size=chunk_size
         )
         resp = await self.post(f"/v1/media/upload?target={target}&duration={duration}",
-                               writer,
-                               content_type=f"multipart/form-data; boundary={writer.boundary}")
-        return resp if raw_output else Media.from_dict(resp)
+                               stream,
+                               content_type=stream.content_type)
+        return resp if raw_output else self._decode(Media, resp)
 
-    def on_message(self, text: Optional[str] = None):
+    def on_message(
+        self,
+        text: Optional[str] = None,
+        *,
+        thread_id: Optional[int] = None,
+        message_type: Union[EChatMessageType, int, None] = None,
+        uid: Optional[int] = None,
+        prefix: Optional[str] = None
+    ):
         """
         A high-level decorator for registering message handlers with a specific text.
         :param text: text of the messages
+        :param thread_id: id of the chat the messages should come from
+        :param message_type: ChatMessageType enum field or int identifier of the messages
+        :param uid: id of the author of the messages
+        :param prefix: text the messages should start with
         :return:
         """
         def decorator(handler: Callable[[ChatMessage], Any]):
-            self.register_chat_message_handler(handler, lambda x: (x.content == text) if text is not None else True)
+            self.register_chat_message_handler(
+                handler,
+                thread_id=thread_id,
+                message_type=message_type,
+                uid=uid,
+                content=text,
+                prefix=prefix
+            )
 
         return decorator
 
@@ -1433,14 +1815,36 @@ class Client(RequestManager):
     def register_chat_message_handler(
         self,
         handler: Callable[[ChatMessage], Any],
-        content_filter: Callable[[ChatMessage], bool] = lambda _: True,
-        content_transform: Callable[[ChatMessage], Any] = lambda x: x
-    ) -> None:
-        """
-        Register handler to receive new message events from the server
+        content_filter: Optional[Callable[[ChatMessage], bool]] = None,
+        content_transform: Optional[Callable[[ChatMessage], Any]] = None,
+        *,
+        thread_id: Optional[int] = None,
+        message_type: Union[EChatMessageType, int, None] = None,
+        uid: Optional[int] = None,
+        content: Optional[str] = None,
+        prefix: Optional[str] = None
+    ) -> str:
+        """
+        Register handler to receive new message events from the server.
+        The keyword filters are looked up in indexes, so prefer them over content_filter where possible.
         :param handler: function(model.ChatMessage) -> Any
         :param content_filter: function(model.ChatMessage) -> bool
         :param content_transform: function(model.ChatMessage) -> Any
-        :return:
-        """
-        self.websocket.subscribe(handler, lambda x: isinstance(x, ChatMessage) and content_filter(x), content_transform)
+        :param thread_id: id of the chat the messages should come from
+        :param message_type: ChatMessageType enum field or int identifier of the messages
+        :param uid: id of the author of the messages
+        :param content: exact text of the messages
+        :param prefix: text the messages should start with
+        :return: subscription id that can be passed to websocket.unsubscribe
+        """
+        return self.websocket.subscribe(
+            handler,
+            content_filter,
+            content_transform,
+            content_type=ChatMessage,
+            thread_id=thread_id,
+            message_type=message_type if message_type is None or isinstance(message_type, int) else message_type.value,
+            uid=uid,
+            content=content,
+            prefix=prefix
+        )
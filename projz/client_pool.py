@@ -0,0 +1,190 @@
+from .client import Client
+from .model import ChatMessage
+from aiohttp import TCPConnector
+from asyncio import Semaphore
+from asyncio import gather
+from inspect import iscoroutinefunction
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class ClientPool:
+    def __init__(
+        self,
+        connector_limit: int = 0,
+        connector_limit_per_host: int = 0,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 60,
+        **client_kwargs
+    ):
+        """
+        Hosts several accounts in one event loop over one connection pool and DNS cache.
+        Every account keeps its own Client with its own sid, device id, websocket and handlers.
+        :param connector_limit: limit of simultaneous connections of all accounts (0 - no limit),
+        keep in mind that every logged in account holds one websocket connection
+        :param connector_limit_per_host: limit of simultaneous connections to one host (0 - no limit)
+        :param dns_cache_ttl: how long resolved addresses are cached, in seconds
+        :param keepalive_timeout: how long idle connections are kept open, in seconds
+        :param client_kwargs: default arguments of the created clients
+        """
+        self.connector_limit = connector_limit
+        self.connector_limit_per_host = connector_limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.client_kwargs = client_kwargs
+        self.clients: dict[str, Client] = {}
+        self.connector: Optional[TCPConnector] = None
+        self._handlers: list[tuple[Callable[[Client, ChatMessage], Any], dict]] = []
+        self._next_client = 0
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+    def __iter__(self) -> Iterator[Client]:
+        return iter(list(self.clients.values()))
+
+    def __getitem__(self, name: str) -> Client:
+        return self.clients[name]
+
+    async def __aenter__(self) -> "ClientPool":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def _get_connector(self) -> TCPConnector:
+        if self.connector is None or self.connector.closed:
+            self.connector = TCPConnector(
+                limit=self.connector_limit,
+                limit_per_host=self.connector_limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True,
+                keepalive_timeout=self.keepalive_timeout
+            )
+        return self.connector
+
+    def add(self, name: Optional[str] = None, device_id: Optional[str] = None, **client_kwargs) -> Client:
+        """
+        Create a client for one more account, it still has to be logged in
+        :param name: key of the account in the pool, the position of the account by default
+        :param device_id: device id of the account, a new one is generated by default
+        :param client_kwargs: arguments of the client, override the default ones of the pool
+        :return: Client
+        """
+        name = name if name is not None else str(len(self.clients))
+        if name in self.clients: raise ValueError(f"Account \"{name}\" is already in the pool")
+        client = Client(**{**self.client_kwargs, **client_kwargs, "connector": self._get_connector()})
+        if device_id is not None: client.device_id = device_id
+        for handler, filters in self._handlers: self._register(client, handler, filters)
+        self.clients[name] = client
+        return client
+
+    async def remove(self, name: str) -> None:
+        """
+        Close the client of the account and remove it from the pool
+        :param name: key of the account in the pool
+        :return:
+        """
+        await self.clients.pop(name).aclose()
+
+    def next_client(self) -> Client:
+        """
+        Pick the accounts in turn
+        :return: Client
+        """
+        clients = list(self.clients.values())
+        if not clients: raise ValueError("The pool has no accounts")
+        # The index is taken modulo the current size, removed accounts can leave it past the end.
+        client = clients[self._next_client % len(clients)]
+        self._next_client = (self._next_client + 1) % len(clients)
+        return client
+
+    @staticmethod
+    def _register(client: Client, handler: Callable[[Client, ChatMessage], Any], filters: dict) -> None:
+        # The wrapper has to stay a coroutine function for coroutine handlers to be scheduled.
+        if iscoroutinefunction(handler):
+            async def bound_handler(message: ChatMessage): return await handler(client, message)
+        else:
+            def bound_handler(message: ChatMessage): return handler(client, message)
+        client.register_chat_message_handler(bound_handler, **filters)
+
+    def on_message(self, text: Optional[str] = None, **filters):
+        """
+        A decorator for registering message handlers on all accounts, including the ones added later.
+        The handler also receives the client of the account that got the message.
+        :param text: text of the messages
+        :param filters: keyword filters of Client.on_message
+        :return:
+        """
+        def decorator(handler: Callable[[Client, ChatMessage], Any]):
+            filters["content"] = text
+            self._handlers.append((handler, filters))
+            for client in self: self._register(client, handler, filters)
+            return handler
+
+        return decorator
+
+    def on_command(self, text: str, prefix: Optional[str] = None):
+        """
+        A decorator for registering command handlers on all accounts, see ClientPool.on_message
+        :param text: text of the command
+        :param prefix: The prefix of the command. By default, the "commands_prefix" argument of the pool or "/" is used.
+        :return:
+        """
+        return self.on_message(f"{prefix or self.client_kwargs.get('commands_prefix', '/')}{text}")
+
+    async def run_all(self, function: Callable[[Client], Awaitable[R]], return_exceptions: bool = False) -> list[R]:
+        """
+        Run function on every account at the same time
+        :param function: async function(Client) -> Any
+        :param return_exceptions: return exceptions in the results instead of raising the first one
+        :return: results in the order of the accounts
+        """
+        return await gather(*(function(client) for client in self), return_exceptions=return_exceptions)
+
+    async def distribute(
+        self,
+        function: Callable[[Client, T], Awaitable[R]],
+        items: Iterable[T],
+        concurrency_per_account: int = 4,
+        return_exceptions: bool = False
+    ) -> list[R]:
+        """
+        Spread the items over the accounts in turn and process them
+        :param function: async function(Client, item) -> Any
+        :param items: items to process
+        :param concurrency_per_account: how many items one account processes at the same time
+        :param return_exceptions: return exceptions in the results instead of raising the first one
+        :return: results in the order of the items
+        """
+        clients = list(self.clients.values())
+        if not clients: raise ValueError("The pool has no accounts")
+        semaphores = [Semaphore(concurrency_per_account) for _ in clients]
+
+        async def process(index: int, item: T) -> R:
+            async with semaphores[index % len(clients)]:
+                return await function(clients[index % len(clients)], item)
+
+        return await gather(
+            *(process(index, item) for index, item in enumerate(items)),
+            return_exceptions=return_exceptions
+        )
+
+    async def aclose(self) -> None:
+        """
+        Close the clients of all accounts and the shared connections
+        :return:
+        """
+        for client in self: await client.aclose()
+        self.clients.clear()
+        if self.connector is not None:
+            await self.connector.close()
+            self.connector = None
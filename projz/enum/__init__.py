@@ -13,3 +13,4 @@ from .currency_type import ECurrencyType
 from .party_query_type import EPartyQueryType
 from .chat_query_type import EChatQueryType
 from .circle_members_query_type import ECircleMembersQueryType
+from .overflow_policy import EOverflowPolicy
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class EOverflowPolicy(Enum):
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
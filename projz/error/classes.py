@@ -37,6 +37,9 @@ class ApiException(Exception):
 class BadResponse(ApiException): ...
 
 
+class TooManyRequests(BadResponse): ...
+
+
 @ApiException.create(2009)
 class InvalidEmail(ApiException): ...
 
@@ -51,3 +54,9 @@ class InvalidVerificationCode(ApiException): ...
 
 @ApiException.create(1000004)
 class AccountHasNoWallet(ApiException): ...
+
+
+class WebsocketDisconnected(ConnectionError): ...
+
+
+class AckTimeout(TimeoutError): ...
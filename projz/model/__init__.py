@@ -3,6 +3,7 @@ from .response import MemberTitlesInfo
 from .response import MultiInvitationCodeInfo
 from .response import BlockUsersInfo
 from .util import PaginatedList
+from .parse import IdentityMap
 from .util import RichFormatBuilder
 from .util import RichFormatTextBuilder
 from .media import Media
@@ -17,6 +18,7 @@ from .blog import Blog
 from .chat import Chat
 from .default_background_media import DefaultBackgroundMedia
 from .chat_message import ChatMessage
+from .lazy_chat_message import LazyChatMessage
 from .poll import Poll
 from .dice import Dice
 from .rich_format import RichFormat
@@ -1,13 +1,15 @@
 from dataclasses_json import dataclass_json
 from dataclasses_json import LetterCase
-from dataclasses import dataclass
 from typing import Optional
 from datetime import datetime
 from .parse import time_field
+from .parse import fast_decoder
+from .parse import slotted_dataclass
 
 
+@fast_decoder
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@slotted_dataclass
 class Account:
     uid: Optional[int] = None
     status: Optional[int] = None
@@ -1,15 +1,17 @@
-from dataclasses import dataclass
 from dataclasses_json import dataclass_json
 from dataclasses_json import LetterCase
 from typing import Optional
 from datetime import datetime
 from .parse import time_field
+from .parse import fast_decoder
+from .parse import slotted_dataclass
 from .blog import Blog
 from .chat import Chat
 
 
+@fast_decoder
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@slotted_dataclass
 class BlockedItemWrapper:
     id: Optional[int] = None
     object_id: Optional[int] = None
@@ -1,10 +1,11 @@
-from dataclasses import dataclass
 from dataclasses_json import dataclass_json
 from dataclasses_json import LetterCase
 from typing import Optional
 from datetime import datetime
 from .parse import time_field
 from .parse import extensions_field
+from .parse import fast_decoder
+from .parse import slotted_dataclass
 from .media import Media
 from .rich_format import RichFormat
 from .user import User
@@ -12,8 +13,9 @@ from .circle import Circle
 from .reaction import Reaction
 
 
+@fast_decoder
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@slotted_dataclass
 class Blog:
     created_time: Optional[datetime] = time_field()
     edited_time: Optional[datetime] = time_field()
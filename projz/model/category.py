@@ -1,21 +1,25 @@
-from dataclasses import dataclass
 from dataclasses_json import dataclass_json
 from dataclasses_json import LetterCase
 from typing import Optional
 from datetime import datetime
 from .parse import time_field
 from .parse import extensions_field
+from .parse import fast_decoder
+from .parse import slotted_dataclass
 from .sticker import Sticker
 
 
+@fast_decoder
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@slotted_dataclass
 class Category:
+    @fast_decoder
     @dataclass_json(letter_case=LetterCase.CAMEL)
-    @dataclass
+    @slotted_dataclass
     class TagInfo:
+        @fast_decoder
         @dataclass_json(letter_case=LetterCase.CAMEL)
-        @dataclass
+        @slotted_dataclass
         class Style:
             background_color: Optional[str] = None
             text_color: Optional[str] = None
@@ -1,9 +1,11 @@
-from dataclasses import dataclass
 from dataclasses_json import dataclass_json
 from dataclasses_json import LetterCase
 from typing import Optional
 from datetime import datetime
 from .parse import time_field
+from .parse import fast_decoder
+from .parse import slotted_dataclass
+from .parse import interned
 from .media import Media
 from .rich_format import RichFormat
 from .category import Category
@@ -13,11 +15,14 @@ from .blog import Blog
 from .circle import Circle
 
 
+@interned("thread_id")
+@fast_decoder
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@slotted_dataclass
 class Chat:
+    @fast_decoder
     @dataclass_json(letter_case=LetterCase.CAMEL)
-    @dataclass
+    @slotted_dataclass
     class EventTag:
         endTime: Optional[datetime] = time_field()
         tagId: Optional[int] = None
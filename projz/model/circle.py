@@ -1,20 +1,25 @@
-from dataclasses import dataclass
 from dataclasses_json import dataclass_json
 from dataclasses_json import LetterCase
 from typing import Optional
 from datetime import datetime
 from .parse import time_field
 from .parse import extensions_field
+from .parse import fast_decoder
+from .parse import slotted_dataclass
+from .parse import interned
 from .media import Media
 from .user import User
 from .category import Category
 
 
+@interned("circle_id")
+@fast_decoder
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@slotted_dataclass
 class Circle:
+    @fast_decoder
     @dataclass_json(letter_case=LetterCase.CAMEL)
-    @dataclass
+    @slotted_dataclass
     class CircleBackground:
         background_image: Optional[Media] = None
     created_time: Optional[datetime] = time_field()
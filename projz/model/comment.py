@@ -1,15 +1,17 @@
-from dataclasses import dataclass
 from dataclasses_json import dataclass_json
 from dataclasses_json import LetterCase
 from typing import Optional
 from datetime import datetime
 from .parse import time_field
+from .parse import fast_decoder
+from .parse import slotted_dataclass
 from .user import User
 from .media import Media
 
 
+@fast_decoder
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@slotted_dataclass
 class Comment:
     created_time: Optional[datetime] = time_field()
     comment_id: Optional[int] = None
@@ -1,14 +1,16 @@
-from dataclasses import dataclass
 from dataclasses import field
 from dataclasses_json import dataclass_json
 from dataclasses_json import LetterCase
 from typing import Optional
 from .media import Media
 from .parse import wallet_amount_field
+from .parse import fast_decoder
+from .parse import slotted_dataclass
 
 
+@fast_decoder
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@slotted_dataclass
 class Currency:
     currency_type: Optional[int] = None
     name: Optional[str] = None
@@ -1,14 +1,16 @@
-from dataclasses import dataclass
 from dataclasses_json import dataclass_json
 from dataclasses_json import LetterCase
 from typing import Optional
 from datetime import datetime
 from .parse import time_field
+from .parse import fast_decoder
+from .parse import slotted_dataclass
 from .media import Media
 
 
+@fast_decoder
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@slotted_dataclass
 class DefaultBackgroundMedia:
     created_time: Optional[datetime] = time_field()
     id: Optional[int] = None
@@ -1,4 +1,3 @@
-from dataclasses import dataclass
 from dataclasses import field
 from dataclasses_json import dataclass_json
 from dataclasses_json import LetterCase
@@ -9,10 +8,13 @@ from .user import User
 from .parse import extensions_field
 from .parse import time_field
 from .parse import wallet_amount_field
+from .parse import fast_decoder
+from .parse import slotted_dataclass
 
 
+@fast_decoder
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@slotted_dataclass
 class GiftBox:
     box_id: Optional[int] = None
     uid: Optional[int] = None
@@ -0,0 +1,51 @@
+from dataclasses import fields
+from typing import Any
+from typing import Callable
+from typing import Optional
+from .chat_message import ChatMessage
+from .parse import get_field_readers
+
+
+class _LazyField:
+    def __init__(self, name: str, reader: Callable[[dict], Any]):
+        self.name = name
+        self.reader = reader
+
+    def __get__(self, instance: Any, owner: type) -> Any:
+        if instance is None: return self
+        # The decoded value is stored in the instance dict, which takes priority over this descriptor afterwards.
+        value = instance.__dict__[self.name] = self.reader(instance.raw)
+        return value
+
+
+class LazyChatMessage(ChatMessage):
+    """
+    ChatMessage backed by the raw JSON document, each field is decoded on first access.
+    Fields passed as keyword arguments, as dataclasses.replace does, are used as they are.
+    """
+    def __init__(self, raw: Optional[dict] = None, **values: Any):
+        self.raw = raw if raw is not None else {}
+        # The instance dict takes priority over the lazy fields, these values are never read from raw.
+        self.__dict__.update(values)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, ChatMessage): return NotImplemented
+        return all(getattr(self, field.name) == getattr(other, field.name) for field in fields(ChatMessage))
+
+    __hash__ = None
+
+    @classmethod
+    def from_dict(cls, kvs: dict, *, infer_missing: bool = False) -> ChatMessage:
+        if infer_missing: return ChatMessage.from_dict(kvs, infer_missing=True)
+        return cls(kvs)
+
+    def decode(self) -> ChatMessage:
+        """
+        Decode all remaining fields
+        :return: model.ChatMessage
+        """
+        return ChatMessage(**{field.name: getattr(self, field.name) for field in fields(ChatMessage) if field.init})
+
+
+for _name, _reader in (get_field_readers(ChatMessage) or {}).items():
+    setattr(LazyChatMessage, _name, _LazyField(_name, _reader))
@@ -1,11 +1,13 @@
-from dataclasses import dataclass
 from dataclasses_json import dataclass_json
 from dataclasses_json import LetterCase
 from typing import Optional
+from .parse import fast_decoder
+from .parse import slotted_dataclass
 
 
+@fast_decoder
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@slotted_dataclass
 class LinkInfo:
     path: Optional[str] = None
     object_id: Optional[int] = None
@@ -1,15 +1,20 @@
 from dataclasses_json import dataclass_json
 from dataclasses_json import LetterCase
-from dataclasses import dataclass
 from dataclasses import field
 from typing import Optional
+from .parse import fast_decoder
+from .parse import slotted_dataclass
+from .parse import interned
 
 
+@interned("media_id")
+@fast_decoder
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@slotted_dataclass
 class Media:
+    @fast_decoder
     @dataclass_json(letter_case=LetterCase.CAMEL)
-    @dataclass
+    @slotted_dataclass
     class Resource:
         width: int
         height: int
@@ -1 +1,7 @@
 from .parseutils import *
+from .fast_decoder import fast_decoder
+from .fast_decoder import get_decoder
+from .fast_decoder import get_field_readers
+from .fast_encoder import get_encoder
+from .identity_map import IdentityMap
+from .identity_map import interned
@@ -0,0 +1,251 @@
+from .identity_map import interning_decoder
+from dataclasses import MISSING
+from dataclasses import fields
+from dataclasses import is_dataclass
+from dataclasses_json import DataClassJsonMixin
+from dataclasses_json.cfg import global_config
+from typing import Any
+from typing import Callable
+from typing import Optional
+from typing import Union
+from typing import get_args
+from typing import get_origin
+from typing import get_type_hints
+
+_decoders: dict[type, Callable[[Any], Any]] = {}
+_field_readers: dict[type, dict[str, Callable[[dict], Any]]] = {}
+_MISSING = object()
+_PRIMITIVES = (int, float, str, bool)
+
+
+class _Fallback(Exception):
+    """The value does not have the shape of a decoded JSON document."""
+
+
+class _NotCompilable(Exception):
+    """The class uses a feature the compiled decoder does not reproduce."""
+
+
+def _original_from_dict(cls: type) -> Callable[[Any], Any]:
+    return lambda data: DataClassJsonMixin.from_dict.__func__(cls, data)
+
+
+def _is_optional(field_type: Any) -> bool:
+    return field_type is Any or (get_origin(field_type) is Union and type(None) in get_args(field_type))
+
+
+def _primitive_converter(field_type: type) -> Callable[[Any], Any]:
+    return lambda value: value if isinstance(value, field_type) else field_type(value)
+
+
+def _raise_fallback(*_) -> Any:
+    raise _Fallback
+
+
+def _list_converter(convert_item: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    def convert(value: Any) -> Any:
+        if value is None: return None
+        if type(value) is not list: raise _Fallback
+        return [convert_item(item) for item in value]
+    return convert
+
+
+def _dict_converter(convert_key: Optional[Callable[[Any], Any]], convert_value: Optional[Callable[[Any], Any]]):
+    def convert(value: Any) -> Any:
+        if value is None: return None
+        if type(value) is not dict: raise _Fallback
+        if convert_key is None and convert_value is None: return dict(value)
+        return {
+            (key if convert_key is None else convert_key(key)): (item if convert_value is None else convert_value(item))
+            for key, item in value.items()
+        }
+    return convert
+
+
+def _key_converter(key_type: Any) -> Optional[Callable[[Any], Any]]:
+    if key_type is Any: return None
+    if key_type is str: return lambda key: key if type(key) is str else _raise_fallback()
+    raise _NotCompilable
+
+
+def _converter(field_type: Any) -> Optional[Callable[[Any], Any]]:
+    """
+    Build a converter that behaves like dataclasses_json decoding a value of field_type.
+    None means that the value is passed through unchanged.
+    """
+    if field_type is Any: return None
+    if is_dataclass(field_type): return _nested_converter(field_type)
+    if field_type in _PRIMITIVES: return _primitive_converter(field_type)
+    origin, args = get_origin(field_type), get_args(field_type)
+    if origin is Union:
+        if len(args) != 2 or type(None) not in args: raise _NotCompilable
+        convert = _converter(next(arg for arg in args if arg is not type(None)))
+        if convert is None: return None
+        return lambda value: None if value is None else convert(value)
+    if field_type is list or origin is list:
+        item_convert = _converter(args[0]) if args else None
+        return _list_converter(item_convert if item_convert is not None else (lambda item: item))
+    if field_type is dict or origin is dict:
+        key_type, value_type = args if args else (Any, Any)
+        return _dict_converter(_key_converter(key_type), _converter(value_type))
+    raise _NotCompilable
+
+
+def _lazy_decoder(cls: type) -> Callable[[Any], Any]:
+    # Nested classes may reference each other, so they are compiled on first use.
+    def decode(data: Any) -> Any:
+        return get_decoder(cls)(data)
+    return decode
+
+
+def _nested_converter(cls: type) -> Callable[[Any], Any]:
+    decode = _lazy_decoder(cls)
+    return lambda value: decode(value) if type(value) is dict else _raise_fallback()
+
+
+def _field_config(cls: type, field) -> dict:
+    if field.type in global_config.decoders: raise _NotCompilable
+    config = dict(getattr(cls, "dataclass_json_config", None) or {})
+    config.update(field.metadata.get("dataclasses_json", {}))
+    return config
+
+
+def _compile(cls: type) -> Callable[[Any], Any]:
+    config = getattr(cls, "dataclass_json_config", None) or {}
+    if config.get("undefined") is not None: raise _NotCompilable
+    hints = get_type_hints(cls)
+    namespace = {"_cls": cls, "_M": _MISSING, "_Fallback": _Fallback, "_slow": _original_from_dict(cls)}
+    keys, names = {}, set()
+    lines = [
+        "def decode(data):",
+        "    if type(data) is not dict or not _aliases.isdisjoint(data): return _slow(data)",
+        "    get = data.get",
+        "    try:"
+    ]
+    arguments = []
+    for index, field in enumerate(fields(cls)):
+        names.add(field.name)
+        field_config = _field_config(cls, field)
+        letter_case = field_config.get("letter_case")
+        key = letter_case(field.name) if letter_case is not None else field.name
+        if key in keys: raise _NotCompilable
+        keys[key] = field.name
+        if not field.init: continue
+        field_type = hints[field.name]
+        value, target = f"v{index}", f"f{index}"
+        lines.append(f"        {value} = get({key!r}, _M)")
+        if field.default is not MISSING:
+            namespace[f"_default{index}"] = field.default
+            lines.append(f"        if {value} is _M: {value} = _default{index}")
+        elif field.default_factory is not MISSING:
+            namespace[f"_factory{index}"] = field.default_factory
+            lines.append(f"        if {value} is _M: {value} = _factory{index}()")
+        else:
+            lines.append(f"        if {value} is _M: raise _Fallback")
+        if _is_optional(field_type):
+            lines.append(f"        if {value} is None: {target} = None")
+        else:
+            # dataclasses_json warns about None in a non-optional field, so that case is left to it.
+            lines.append(f"        if {value} is None: raise _Fallback")
+        decoder = field_config.get("decoder")
+        if decoder is not None:
+            namespace[f"_type{index}"], namespace[f"_decoder{index}"] = field_type, decoder
+            lines.append(f"        elif type({value}) is _type{index}: {target} = {value}")
+            lines.append(f"        else: {target} = _decoder{index}({value})")
+        elif is_dataclass(field_type):
+            namespace[f"_convert{index}"] = _lazy_decoder(field_type)
+            lines.append(f"        elif type({value}) is dict: {target} = _convert{index}({value})")
+            lines.append("        else: raise _Fallback")
+        else:
+            convert = _converter(field_type)
+            if convert is None:
+                lines.append(f"        else: {target} = {value}")
+            else:
+                namespace[f"_convert{index}"] = convert
+                lines.append(f"        else: {target} = _convert{index}({value})")
+        arguments.append(f"{field.name}={target}")
+    # A snake_case key that is not the JSON name of any field is still mapped onto the field by dataclasses_json.
+    aliases = {name for name in names if name not in keys}
+    namespace["_aliases"] = frozenset(aliases)
+    lines.append("    except _Fallback:")
+    lines.append("        return _slow(data)")
+    lines.append(f"    return _cls({', '.join(arguments)})")
+    exec("\n".join(lines), namespace)
+    return namespace["decode"]
+
+
+def _value_converter(field_type: Any, decoder: Optional[Callable[[Any], Any]]) -> Callable[[Any], Any]:
+    if decoder is not None: return lambda value: value if type(value) is field_type else decoder(value)
+    if is_dataclass(field_type): return _nested_converter(field_type)
+    convert = _converter(field_type)
+    return convert if convert is not None else (lambda value: value)
+
+
+def _field_reader(cls: type, field, field_type: Any, key: str, decoder, aliases: frozenset) -> Callable[[dict], Any]:
+    slow = _original_from_dict(cls)
+    optional = _is_optional(field_type)
+    convert = _value_converter(field_type, decoder)
+    name = field.name
+
+    def read(data: dict) -> Any:
+        if not aliases.isdisjoint(data): return getattr(slow(data), name)
+        value = data.get(key, _MISSING)
+        if value is _MISSING:
+            if field.default is not MISSING: return field.default
+            if field.default_factory is not MISSING: return field.default_factory()
+            return getattr(slow(data), name)
+        if value is None:
+            return None if optional else getattr(slow(data), name)
+        try: return convert(value)
+        except _Fallback: return getattr(slow(data), name)
+    return read
+
+
+def get_field_readers(cls: type) -> Optional[dict[str, Callable[[dict], Any]]]:
+    """
+    Build one function(data) -> value per field that decodes only that field of a JSON document,
+    with the same result as the field of the fully decoded object.
+    None is returned for classes that can not be compiled.
+    """
+    if cls in _field_readers: return _field_readers[cls]
+    readers = None
+    try:
+        config = getattr(cls, "dataclass_json_config", None) or {}
+        if config.get("undefined") is not None: raise _NotCompilable
+        hints = get_type_hints(cls)
+        specs = []
+        for field in fields(cls):
+            field_config = _field_config(cls, field)
+            letter_case = field_config.get("letter_case")
+            key = letter_case(field.name) if letter_case is not None else field.name
+            specs.append((field, hints[field.name], key, field_config.get("decoder")))
+        keys = {key for _, _, key, _ in specs}
+        if len(keys) != len(specs): raise _NotCompilable
+        aliases = frozenset(field.name for field, _, _, _ in specs if field.name not in keys)
+        readers = {
+            field.name: _field_reader(cls, field, field_type, key, decoder, aliases)
+            for field, field_type, key, decoder in specs if field.init
+        }
+    except _NotCompilable:
+        pass
+    _field_readers[cls] = readers
+    return readers
+
+
+def get_decoder(cls: type) -> Callable[[Any], Any]:
+    decoder = _decoders.get(cls)
+    if decoder is None:
+        try: decoder = _compile(cls)
+        except _NotCompilable: decoder = _original_from_dict(cls)
+        decoder = interning_decoder(cls, decoder)
+        _decoders[cls] = decoder
+    return decoder
+
+
+def fast_decoder(cls: type) -> type:
+    def from_dict(klass: type, kvs: Any, *, infer_missing: bool = False) -> Any:
+        if infer_missing: return DataClassJsonMixin.from_dict.__func__(klass, kvs, infer_missing=True)
+        return get_decoder(klass)(kvs)
+
+    cls.from_dict = classmethod(from_dict)
+    return cls
@@ -0,0 +1,79 @@
+from .fast_decoder import _NotCompilable
+from copy import deepcopy
+from dataclasses import fields
+from dataclasses import is_dataclass
+from dataclasses_json.cfg import global_config
+from enum import Enum
+from typing import Any
+from typing import Callable
+from typing import Collection
+from typing import Mapping
+
+_encoders: dict[type, Callable[[Any], dict]] = {}
+_SCALARS = frozenset((int, float, str, bool, type(None)))
+
+
+def _original_to_dict(model: Any) -> dict:
+    return model.to_dict(encode_json=False)
+
+
+def _encode_value(value: Any) -> Any:
+    # The same walk as dataclasses_json does for a value without a field encoder.
+    value_type = type(value)
+    if value_type in _SCALARS: return value
+    if is_dataclass(value) and not isinstance(value, type): return get_encoder(value_type)(value)
+    if isinstance(value, Mapping): return {_encode_value(key): _encode_value(item) for key, item in value.items()}
+    if isinstance(value, Collection) and not isinstance(value, (str, bytes, Enum)):
+        return [_encode_value(item) for item in value]
+    encoder = global_config.encoders.get(value_type)
+    if encoder is not None: return encoder(value)
+    return deepcopy(value)
+
+
+def _compile(cls: type) -> Callable[[Any], dict]:
+    config = getattr(cls, "dataclass_json_config", None) or {}
+    if config.get("undefined") is not None: raise _NotCompilable
+    namespace = {"_S": _SCALARS, "_value": _encode_value}
+    keys = set()
+    lines = [
+        "def encode(obj):",
+        "    result = {}"
+    ]
+    for index, field in enumerate(fields(cls)):
+        field_config = {}
+        if field.type in global_config.encoders: field_config["encoder"] = global_config.encoders[field.type]
+        field_config.update(config)
+        field_config.update(field.metadata.get("dataclasses_json", {}))
+        letter_case = field_config.get("letter_case")
+        key = letter_case(field.name) if letter_case is not None else field.name
+        # dataclasses_json raises an error for two fields with one key, the fallback reproduces it.
+        if key in keys: raise _NotCompilable
+        keys.add(key)
+        lines.append(f"    v = obj.{field.name}")
+        encoder, exclude = field_config.get("encoder"), field_config.get("exclude")
+        if encoder is None: lines.append("    if type(v) not in _S: v = _value(v)")
+        indent = "    "
+        if exclude is not None:
+            namespace[f"_exclude{index}"] = exclude
+            lines.append(f"    if not _exclude{index}(v):")
+            indent = "        "
+        if encoder is None: lines.append(f"{indent}result[{key!r}] = v")
+        else:
+            namespace[f"_encoder{index}"] = encoder
+            lines.append(f"{indent}result[{key!r}] = _encoder{index}(v)")
+    lines.append("    return result")
+    exec("\n".join(lines), namespace)
+    return namespace["encode"]
+
+
+def get_encoder(cls: type) -> Callable[[Any], dict]:
+    """
+    Build a function(model) -> dict with the same result as model.to_dict(encode_json=False),
+    without walking the type overrides of dataclasses_json for every object.
+    """
+    encoder = _encoders.get(cls)
+    if encoder is None:
+        try: encoder = _compile(cls)
+        except _NotCompilable: encoder = _original_to_dict
+        _encoders[cls] = encoder
+    return encoder
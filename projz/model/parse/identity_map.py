@@ -0,0 +1,94 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import monotonic
+from typing import Any
+from typing import Callable
+from typing import Hashable
+from typing import Iterator
+from typing import Optional
+from weakref import ref
+
+_active: ContextVar[Optional["IdentityMap"]] = ContextVar("projz_identity_map", default=None)
+_identity_fields: dict[type, str] = {}
+
+
+def interned(field_name: str):
+    """
+    Mark the field that identifies the objects of a model class, an active IdentityMap shares them by its value.
+    """
+    def decorator(cls: type) -> type:
+        config = getattr(cls, "dataclass_json_config", None) or {}
+        letter_case = config.get("letter_case")
+        _identity_fields[cls] = letter_case(field_name) if letter_case is not None else field_name
+        return cls
+    return decorator
+
+
+def interning_decoder(cls: type, decode: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    key = _identity_fields.get(cls)
+    if key is None: return decode
+
+    def decode_interned(data: Any) -> Any:
+        identity_map = _active.get()
+        if identity_map is None or type(data) is not dict: return decode(data)
+        identity = data.get(key)
+        if identity is None: return decode(data)
+        return identity_map.intern(cls, identity, data, decode)
+    return decode_interned
+
+
+def _covers(interned_data: dict, data: dict) -> bool:
+    if data is interned_data: return True
+    if len(data) > len(interned_data): return False
+    for key, value in data.items():
+        if key not in interned_data or interned_data[key] != value: return False
+    return True
+
+
+class IdentityMap:
+    def __init__(self, max_age: float = 60):
+        self.max_age = max_age
+        self.entries: dict[tuple[type, Hashable], tuple[ref, dict, float]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @contextmanager
+    def active(self) -> Iterator["IdentityMap"]:
+        token = _active.set(self)
+        try: yield self
+        finally: _active.reset(token)
+
+    def intern(self, cls: type, identity: Hashable, data: dict, decode: Callable[[dict], Any]) -> Any:
+        key = (cls, identity)
+        entry = self.entries.get(key)
+        if entry is not None:
+            instance, interned_data, interned_at = entry[0](), entry[1], entry[2]
+            # Only a document that the interned one already covers with the same values shares the instance,
+            # a changed value or a key more (a full profile after a member list) is decoded again.
+            if instance is not None and monotonic() - interned_at < self.max_age and _covers(interned_data, data):
+                self.hits += 1
+                return instance
+        self.misses += 1
+        instance = decode(data)
+        if type(instance) is not cls: return instance
+        try: reference = ref(instance, lambda dead, key=key: self._discard(key, dead))
+        except TypeError: return instance
+        self.entries[key] = (reference, data, monotonic())
+        return instance
+
+    def _discard(self, key: tuple[type, Hashable], reference: ref) -> None:
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] is reference: del self.entries[key]
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses
+        }
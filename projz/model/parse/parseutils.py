@@ -3,8 +3,10 @@ from dateutil.parser import isoparse
 from typing import Union
 from typing import Optional
 from dataclasses import Field
+from dataclasses import dataclass
 from dataclasses import field
 from dataclasses_json import config
+from sys import version_info
 
 
 def decode_time(encoded_time: Union[int, str, None]) -> Optional[datetime]:
@@ -37,3 +39,11 @@ def extensions_field() -> Field:
 
 def wallet_amount_field() -> Field:
     return field(metadata=config(decoder=decode_wallet_amount), default_factory=0)
+
+
+def slotted_dataclass(cls: type) -> type:
+    # On Python 3.10+ the fields are stored in slots, the instances have no __dict__.
+    # The weakref slot (3.11+) lets an IdentityMap share the instances without keeping them alive.
+    if version_info >= (3, 11): return dataclass(cls, slots=True, weakref_slot=True)
+    if version_info >= (3, 10): return dataclass(cls, slots=True)
+    return dataclass(cls)
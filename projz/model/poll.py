@@ -1,17 +1,20 @@
-from dataclasses import dataclass
 from dataclasses_json import dataclass_json
 from dataclasses_json import LetterCase
 from typing import Optional
 from datetime import datetime
 from .parse import time_field
 from .parse import extensions_field
+from .parse import fast_decoder
+from .parse import slotted_dataclass
 
 
+@fast_decoder
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@slotted_dataclass
 class Poll:
+    @fast_decoder
     @dataclass_json(letter_case=LetterCase.CAMEL)
-    @dataclass
+    @slotted_dataclass
     class PollItem:
         created_time: Optional[datetime] = time_field()
         poll_id: Optional[int] = None
@@ -1,16 +1,19 @@
-from dataclasses import dataclass
 from dataclasses_json import dataclass_json
 from dataclasses_json import LetterCase
 from typing import Optional
 from .media import Media
 from .qi_vote_info import QiVoteInfo
+from .parse import fast_decoder
+from .parse import slotted_dataclass
 
 
+@fast_decoder
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@slotted_dataclass
 class QiVoteFullInfo:
+    @fast_decoder
     @dataclass_json(letter_case=LetterCase.CAMEL)
-    @dataclass
+    @slotted_dataclass
     class VoteResources:
         enabled_icon: Optional[Media] = None
         waiting_icon: Optional[Media] = None
@@ -18,8 +21,9 @@ class QiVoteFullInfo:
         number_background: Optional[Media] = None
         animation_icons: Optional[list[Media]] = None
 
+    @fast_decoder
     @dataclass_json(letter_case=LetterCase.CAMEL)
-    @dataclass
+    @slotted_dataclass
     class VoteConfig:
         daily_quota: Optional[int] = None
         first_quota: Optional[int] = None
@@ -1,14 +1,16 @@
 from dataclasses_json import dataclass_json
 from dataclasses_json import LetterCase
 from dataclasses_json import config
-from dataclasses import dataclass
 from dataclasses import field
 from ..account import Account
 from ..user import User
+from ..parse import fast_decoder
+from ..parse import slotted_dataclass
 
 
+@fast_decoder
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@slotted_dataclass
 class AuthResult:
     secret: str
     account: Account
@@ -1,11 +1,13 @@
-from dataclasses import dataclass
 from dataclasses import field
 from dataclasses_json import dataclass_json
 from dataclasses_json import LetterCase
+from ..parse import fast_decoder
+from ..parse import slotted_dataclass
 
 
+@fast_decoder
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@slotted_dataclass
 class BlockUsersInfo:
     blocked_by_me_list: list[int] = field(default_factory=list)
     block_me_list: list[int] = field(default_factory=list)
@@ -1,17 +1,21 @@
-from dataclasses import dataclass
 from dataclasses_json import dataclass_json
 from dataclasses_json import LetterCase
 from typing import Optional
+from .parse import fast_decoder
+from .parse import slotted_dataclass
 
 
+@fast_decoder
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@slotted_dataclass
 class RichFormat:
+    @fast_decoder
     @dataclass_json(letter_case=LetterCase.CAMEL)
-    @dataclass
+    @slotted_dataclass
     class TextSpan:
+        @fast_decoder
         @dataclass_json(letter_case=LetterCase.CAMEL)
-        @dataclass
+        @slotted_dataclass
         class Data:
             bold: Optional[bool] = None
             italic: Optional[bool] = None
@@ -23,11 +27,13 @@ class RichFormat:
         end: Optional[int] = None
         data: Optional[Data] = None
 
+    @fast_decoder
     @dataclass_json(letter_case=LetterCase.CAMEL)
-    @dataclass
+    @slotted_dataclass
     class ParagraphSpan:
+        @fast_decoder
         @dataclass_json(letter_case=LetterCase.CAMEL)
-        @dataclass
+        @slotted_dataclass
         class Data:
             style: Optional[str] = None
             alignment: Optional[str] = None
@@ -35,14 +41,17 @@ class RichFormat:
         end: Optional[int] = None
         data: Optional[Data] = None
 
+    @fast_decoder
     @dataclass_json(letter_case=LetterCase.CAMEL)
-    @dataclass
+    @slotted_dataclass
     class AttachmentSpan:
+        @fast_decoder
         @dataclass_json(letter_case=LetterCase.CAMEL)
-        @dataclass
+        @slotted_dataclass
         class Data:
+            @fast_decoder
             @dataclass_json(letter_case=LetterCase.CAMEL)
-            @dataclass
+            @slotted_dataclass
             class Link:
                 url: Optional[str] = None
                 custom_title: Optional[str] = None
@@ -50,20 +59,23 @@ class RichFormat:
                 media_ref_id: Optional[int] = None
                 editing_media_id: Optional[str] = None
 
+            @fast_decoder
             @dataclass_json(letter_case=LetterCase.CAMEL)
-            @dataclass
+            @slotted_dataclass
             class Mention:
                 uid: Optional[int] = None
                 role_id: Optional[int] = None
                 role_name_length: Optional[int] = None
 
+            @fast_decoder
             @dataclass_json(letter_case=LetterCase.CAMEL)
-            @dataclass
+            @slotted_dataclass
             class Poll:
                 poll_ref_id: Optional[int] = None
 
+            @fast_decoder
             @dataclass_json(letter_case=LetterCase.CAMEL)
-            @dataclass
+            @slotted_dataclass
             class Media:
                 media_ref_id: Optional[int] = None
             type: Optional[str] = None
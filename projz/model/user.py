@@ -1,7 +1,6 @@
 from dataclasses_json import dataclass_json
 from dataclasses_json import LetterCase
 from dataclasses_json import config
-from dataclasses import dataclass
 from dataclasses import field
 from typing import Optional
 from datetime import datetime
@@ -11,13 +10,19 @@ from .rich_format import RichFormat
 from .sticker import Sticker
 from .parse import time_field
 from .parse import extensions_field
+from .parse import fast_decoder
+from .parse import slotted_dataclass
+from .parse import interned
 
 
+@interned("uid")
+@fast_decoder
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@slotted_dataclass
 class User:
+    @fast_decoder
     @dataclass_json(letter_case=LetterCase.CAMEL)
-    @dataclass
+    @slotted_dataclass
     class ProfileFrame:
         resource: Optional[Media] = field(metadata=config(field_name="res"))
         created_time: Optional[datetime] = time_field()
@@ -26,16 +31,18 @@ class User:
         profile_frame_parent_id: Optional[int] = None
         profile_frame_parent_type: Optional[int] = None
 
+    @fast_decoder
     @dataclass_json(letter_case=LetterCase.CAMEL)
-    @dataclass
+    @slotted_dataclass
     class UserMood:
         type: Optional[int] = None
         sticker_id: Optional[int] = None
         online_status: Optional[int] = None
         sticker: Optional[Sticker] = None
 
+    @fast_decoder
     @dataclass_json(letter_case=LetterCase.CAMEL)
-    @dataclass
+    @slotted_dataclass
     class UserVisitorInfo:
         user_profile_visit_mode: Optional[int] = None
 
@@ -1,14 +1,16 @@
-from dataclasses import dataclass
 from dataclasses_json import dataclass_json
 from dataclasses_json import LetterCase
 from dataclasses_json import config
 from dataclasses import field
 from typing import Optional
 from .currency import Currency
+from .parse import fast_decoder
+from .parse import slotted_dataclass
 
 
+@fast_decoder
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@slotted_dataclass
 class UserTask:
     type: Optional[int] = None
     currency: Optional[Currency] = None
@@ -1,4 +1,3 @@
-from dataclasses import dataclass
 from dataclasses import field
 from dataclasses_json import dataclass_json
 from dataclasses_json import LetterCase
@@ -8,16 +7,21 @@ from .currency import Currency
 from .parse import extensions_field
 from .parse import time_field
 from .parse import wallet_amount_field
+from .parse import fast_decoder
+from .parse import slotted_dataclass
 
 
+@fast_decoder
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@slotted_dataclass
 class Wallet:
+    @fast_decoder
     @dataclass_json(letter_case=LetterCase.CAMEL)
-    @dataclass
+    @slotted_dataclass
     class WalletAccount:
+        @fast_decoder
         @dataclass_json(letter_case=LetterCase.CAMEL)
-        @dataclass
+        @slotted_dataclass
         class WalletCurrencyListItem:
             account_id: Optional[int] = None
             currency_type: Optional[int] = None
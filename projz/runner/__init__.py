@@ -0,0 +1,3 @@
+from .supervisor import Supervisor
+from .worker import load_bot
+from .worker import run_worker
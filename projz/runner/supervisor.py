@@ -0,0 +1,146 @@
+from .worker import run_worker
+from multiprocessing import get_context
+from os import cpu_count
+from queue import Empty
+from signal import SIGTERM
+from signal import signal
+from threading import current_thread
+from threading import main_thread
+from time import monotonic
+from typing import Optional
+
+
+def _sum_stats(snapshots: list[dict], key: str) -> int:
+    return sum(stats.get(key) or 0 for snapshot in snapshots for stats in snapshot.get("websocket", ()))
+
+
+class Supervisor:
+    def __init__(
+        self,
+        bot: str,
+        accounts: list[dict],
+        workers: Optional[int] = None,
+        shard_by: str = "threads",
+        stats_interval: float = 30,
+        restart_delay: float = 1,
+        max_restart_delay: float = 60,
+        print_stats: bool = True
+    ):
+        """
+        Runs a bot in several worker processes and restarts the crashed ones.
+        :param bot: "module:attribute" of the Client or ClientPool with the registered handlers
+        :param accounts: dicts with "email"/"phone_number" and "password", or "secret"
+        :param workers: number of the worker processes, the number of CPUs by default
+        :param shard_by: "threads" - every worker listens with all accounts and handles its share of the chats,
+        "accounts" - the accounts are split between the workers
+        :param stats_interval: how often the workers report their stats, in seconds
+        :param restart_delay: first delay before a crashed worker is started again, doubles on every crash in a row
+        :param max_restart_delay: upper bound of the restart delay
+        :param print_stats: print the aggregated stats after every report round
+        """
+        if shard_by not in ("threads", "accounts"): raise ValueError("shard_by must be \"threads\" or \"accounts\"")
+        self.bot = bot
+        self.accounts = accounts
+        self.workers = workers or cpu_count() or 1
+        self.shard_by = shard_by
+        self.stats_interval = stats_interval
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.print_stats = print_stats
+        self.restarts = 0
+        self.snapshots: dict[int, dict] = {}
+        # Spawned workers start with a clean interpreter, so no event loop or socket is inherited from the supervisor.
+        self._context = get_context("spawn")
+        self._stats = self._context.Queue()
+        # With thread sharding the sessions of the accounts are shared by the workers through a manager process.
+        self._manager = None
+        self._sessions = None
+        self._processes = {}
+        self._started_at: dict[int, float] = {}
+        self._delays: dict[int, float] = {}
+        self._restart_at: dict[int, float] = {}
+        self._running = False
+
+    def _start(self, index: int) -> None:
+        process = self._context.Process(
+            target=run_worker,
+            args=(
+                index, self.workers, self.bot, self.accounts, self.shard_by, self._stats, self.stats_interval,
+                self._sessions
+            ),
+            name=f"projz-worker-{index}",
+            daemon=True
+        )
+        process.start()
+        self._processes[index] = process
+        self._started_at[index] = monotonic()
+
+    def _check_workers(self) -> None:
+        now = monotonic()
+        for index, process in list(self._processes.items()):
+            if process is None:
+                if now >= self._restart_at[index]: self._start(index)
+                continue
+            if process.is_alive(): continue
+            if process.exitcode == 0:
+                # A worker without accounts has nothing to do and finishes normally.
+                del self._processes[index]
+                continue
+            # Crash loops back off, a worker that stayed up for a while is restarted quickly again.
+            delay = self._delays.get(index, self.restart_delay)
+            if now - self._started_at[index] > self.max_restart_delay: delay = self.restart_delay
+            print(f"[Supervisor] Worker {index} exited with code {process.exitcode}, restarting in {delay:.1f}s")
+            self._processes[index] = None
+            self._restart_at[index] = now + delay
+            self._delays[index] = min(delay * 2, self.max_restart_delay)
+            self.restarts += 1
+
+    def stats(self) -> dict:
+        snapshots = list(self.snapshots.values())
+        return {
+            "workers": sum(1 for process in self._processes.values() if process is not None and process.is_alive()),
+            "restarts": self.restarts,
+            "accounts": sum(snapshot.get("accounts", 0) for snapshot in snapshots),
+            "received": _sum_stats(snapshots, "received"),
+            "reconnects": _sum_stats(snapshots, "reconnects"),
+            "backfilled": _sum_stats(snapshots, "backfilled"),
+            "handled": sum(pool["completed"] for snapshot in snapshots for pool in snapshot.get("handler_pool", ())),
+            "failed": sum(pool["failed"] for snapshot in snapshots for pool in snapshot.get("handler_pool", ())),
+            "dropped": sum(pool["dropped"] for snapshot in snapshots for pool in snapshot.get("handler_pool", ()))
+        }
+
+    def run(self) -> None:
+        self._running = True
+        if current_thread() is main_thread(): signal(SIGTERM, lambda *_: setattr(self, "_running", False))
+        if self.shard_by == "threads" and self.workers > 1 and self._manager is None:
+            self._manager = self._context.Manager()
+            self._sessions = self._manager.dict()
+        for index in range(self.workers): self._start(index)
+        reported = set()
+        try:
+            while self._running and self._processes:
+                try:
+                    snapshot = self._stats.get(timeout=0.5)
+                    self.snapshots[snapshot["worker"]] = snapshot
+                    reported.add(snapshot["worker"])
+                    if self.print_stats and len(reported) >= len(self._processes):
+                        reported.clear()
+                        print(f"[Supervisor] {self.stats()}")
+                except Empty:
+                    pass
+                self._check_workers()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        self._running = False
+        for process in self._processes.values():
+            if process is not None and process.is_alive(): process.terminate()
+        for process in self._processes.values():
+            if process is not None: process.join(5)
+        self._processes.clear()
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager, self._sessions = None, None
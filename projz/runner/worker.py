@@ -0,0 +1,87 @@
+from ..client import Client
+from ..client_pool import ClientPool
+from ..model import AuthResult
+from asyncio import run
+from asyncio import sleep
+from importlib import import_module
+from multiprocessing import Queue
+from os import getpid
+from typing import MutableMapping
+from typing import Optional
+from typing import Union
+
+Bot = Union[Client, ClientPool]
+
+
+def load_bot(spec: str) -> Bot:
+    """
+    Import the bot by "module:attribute", the attribute is a Client, a ClientPool or a function that returns one of them
+    :param spec: "module:attribute"
+    :return: Client | ClientPool
+    """
+    module_name, _, attribute = spec.partition(":")
+    bot = getattr(import_module(module_name), attribute or "client")
+    if not isinstance(bot, (Client, ClientPool)) and callable(bot): bot = bot()
+    if not isinstance(bot, (Client, ClientPool)): raise TypeError(f"\"{spec}\" is not a Client or a ClientPool")
+    return bot
+
+
+async def login_account(client: Client, account: dict) -> AuthResult:
+    if "secret" in account: return await client.login_secret(account["secret"])
+    elif "email" in account: return await client.login_email(account["email"], account["password"])
+    elif "phone_number" in account: return await client.login_phone_number(account["phone_number"], account["password"])
+    else: raise ValueError("An account needs an email, a phone_number or a secret")
+
+
+async def _open_shared_session(client: Client, account: dict, owner: bool, key: int,
+                               sessions: MutableMapping[int, tuple[str, AuthResult]]) -> None:
+    # Only the owner of an account logs it in, the other workers reuse its session,
+    # also after a restart, so a new login never replaces the session the other workers use.
+    session = sessions.get(key)
+    if session is None and owner:
+        auth_result = await login_account(client, account)
+        sessions[key] = session = (client.device_id, auth_result)
+    while session is None:
+        await sleep(0.5)
+        session = sessions.get(key)
+    client.device_id, auth_result = session
+    await client._auth(auth_result)
+
+
+def _clients(bot: Bot, accounts: list[dict]) -> list[Client]:
+    if isinstance(bot, ClientPool):
+        return [bot.add(account.get("name")) for account in accounts]
+    if len(accounts) > 1: raise ValueError("A Client runs one account, use a ClientPool to run more")
+    return [bot] if accounts else []
+
+
+async def _work(index: int, count: int, bot_spec: str, accounts: list[dict], shard_by: str, stats: Queue,
+                stats_interval: float, sessions: Optional[MutableMapping[int, tuple[str, AuthResult]]]) -> None:
+    bot = load_bot(bot_spec)
+    if shard_by == "accounts": accounts = accounts[index::count]
+    clients = _clients(bot, accounts)
+    if not clients: return
+    for account_index, (client, account) in enumerate(zip(clients, accounts)):
+        if shard_by != "threads" or sessions is None:
+            await login_account(client, account)
+            continue
+        # Every process listens with all accounts and only handles the messages of its share of the threads.
+        client.websocket.shard = (index, count)
+        await _open_shared_session(client, account, account_index % count == index, account_index, sessions)
+    while True:
+        await sleep(stats_interval)
+        stats.put({
+            "worker": index,
+            "pid": getpid(),
+            "accounts": len(clients),
+            "websocket": [client.websocket.stats() for client in clients],
+            "handler_pool": [
+                client.websocket.handler_pool.stats() for client in clients if client.websocket.handler_pool is not None
+            ]
+        })
+
+
+def run_worker(index: int, count: int, bot_spec: str, accounts: list[dict], shard_by: str, stats: Queue,
+               stats_interval: float, sessions: Optional[MutableMapping[int, tuple[str, AuthResult]]] = None) -> None:
+    try: run(_work(index, count, bot_spec, accounts, shard_by, stats, stats_interval, sessions))
+    except KeyboardInterrupt: pass
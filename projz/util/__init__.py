@@ -1 +1,9 @@
+from .latency_recorder import LatencyRecorder
+from .handler_pool import HandlerPool
 from .subscription_handler import SubscriptionHandler
+from .page_iterator import PageIterator
+from .offset_pages import gather_offset_pages
+from .json_codec import IJsonCodec
+from .json_codec import UjsonCodec
+from .json_codec import OrjsonCodec
+from .json_codec import get_default_codec
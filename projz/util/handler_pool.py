@@ -0,0 +1,115 @@
+from .latency_recorder import LatencyRecorder
+from ..enum import EOverflowPolicy
+from asyncio import CancelledError
+from asyncio import Queue
+from asyncio import Task
+from asyncio import create_task
+from asyncio import gather
+from asyncio import get_running_loop
+from time import monotonic
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Hashable
+from typing import Optional
+
+
+class HandlerPool:
+    def __init__(
+        self,
+        workers: int = 8,
+        queue_size: int = 256,
+        overflow_policy: EOverflowPolicy = EOverflowPolicy.DROP_OLDEST
+    ):
+        self.workers = max(workers, 1)
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        self.submitted = 0
+        self.dropped = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_queue_depth = 0
+        self.wait_time = LatencyRecorder()
+        self.latency = LatencyRecorder()
+        self._queues: list[Queue] = []
+        self._tasks: list[Task] = []
+        self._next_queue = 0
+
+    def _queue_for(self, key: Optional[Hashable]) -> Queue:
+        if not self._tasks:
+            self._queues = [Queue(maxsize=self.queue_size) for _ in range(self.workers)]
+            self._tasks = [create_task(self._work(queue)) for queue in self._queues]
+        # Jobs with the same key always land on the same worker, so they run one after another in order.
+        if key is not None: return self._queues[hash(key) % self.workers]
+        self._next_queue = (self._next_queue + 1) % self.workers
+        return self._queues[self._next_queue]
+
+    async def submit(self, key: Optional[Hashable], handler: Callable[[Any], Awaitable[Any]], content: Any) -> bool:
+        queue = self._queue_for(key)
+        if self.overflow_policy is EOverflowPolicy.BLOCK:
+            await queue.put((handler, content, monotonic()))
+            self._accepted(queue)
+            return True
+        return self._put_nowait(queue, (handler, content, monotonic()))
+
+    def submit_nowait(self, key: Optional[Hashable], handler: Callable[[Any], Awaitable[Any]], content: Any) -> bool:
+        # There is nothing to wait on here, so a full queue under BLOCK drops the new job like DROP_NEWEST.
+        return self._put_nowait(self._queue_for(key), (handler, content, monotonic()))
+
+    def _put_nowait(self, queue: Queue, job: tuple) -> bool:
+        if queue.full():
+            self.dropped += 1
+            if self.overflow_policy is not EOverflowPolicy.DROP_OLDEST: return False
+            queue.get_nowait()
+            queue.task_done()
+        queue.put_nowait(job)
+        self._accepted(queue)
+        return True
+
+    def _accepted(self, queue: Queue) -> None:
+        self.submitted += 1
+        if queue.qsize() > self.max_queue_depth: self.max_queue_depth = queue.qsize()
+
+    async def _work(self, queue: Queue) -> None:
+        while True:
+            handler, content, queued_at = await queue.get()
+            started_at = monotonic()
+            self.wait_time.record(started_at - queued_at)
+            try:
+                await handler(content)
+                self.completed += 1
+            except CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                get_running_loop().call_exception_handler({
+                    "message": f"Unhandled exception in subscription handler {handler!r}",
+                    "exception": e
+                })
+            finally:
+                self.latency.record(monotonic() - started_at)
+                queue.task_done()
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(queue.qsize() for queue in self._queues)
+
+    async def join(self) -> None:
+        for queue in self._queues: await queue.join()
+
+    async def aclose(self) -> None:
+        for task in self._tasks: task.cancel()
+        await gather(*self._tasks, return_exceptions=True)
+        self._tasks, self._queues = [], []
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "completed": self.completed,
+            "failed": self.failed,
+            "wait_time": self.wait_time.stats(),
+            "latency": self.latency.stats()
+        }
@@ -0,0 +1,62 @@
+from ..model.parse import get_encoder
+from abc import ABC
+from dataclasses_json import DataClassJsonMixin
+from dataclasses_json.core import _ExtendedEncoder
+from typing import Any
+from typing import Union
+import ujson
+
+try: import orjson
+except ImportError: orjson = None
+
+# Values that are not JSON types are encoded the way DataClassJsonMixin.to_json does it (datetime -> timestamp, ...).
+_encode_default = _ExtendedEncoder().default
+
+
+class IJsonCodec(ABC):
+    name: str = "custom"
+
+    def loads(self, data: Union[bytes, bytearray, memoryview, str]) -> Any: ...
+
+    def dumps(self, obj: Any) -> bytes: ...
+
+    def dumps_str(self, obj: Any) -> str: ...
+
+    def dumps_model(self, model: DataClassJsonMixin) -> bytes:
+        # The compiled encoder builds the same dict as model.to_dict(encode_json=False) in a fraction of the time.
+        return self.dumps(get_encoder(type(model))(model))
+
+
+class UjsonCodec(IJsonCodec):
+    name = "ujson"
+
+    def loads(self, data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        if isinstance(data, memoryview): data = data.tobytes()
+        return ujson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return ujson.dumps(obj, ensure_ascii=False, default=_encode_default).encode("utf-8")
+
+    def dumps_str(self, obj: Any) -> str:
+        return ujson.dumps(obj, ensure_ascii=False, default=_encode_default)
+
+
+class OrjsonCodec(IJsonCodec):
+    name = "orjson"
+    OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS) if orjson is not None else 0
+
+    def __init__(self):
+        if orjson is None: raise ImportError("orjson is not installed")
+
+    def loads(self, data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        return orjson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_encode_default, option=self.OPTIONS)
+
+    def dumps_str(self, obj: Any) -> str:
+        return orjson.dumps(obj, default=_encode_default, option=self.OPTIONS).decode("utf-8")
+
+
+def get_default_codec() -> IJsonCodec:
+    return OrjsonCodec() if orjson is not None else UjsonCodec()
@@ -0,0 +1,61 @@
+from asyncio import create_task
+from asyncio import gather
+from typing import Awaitable
+from typing import Callable
+from typing import Hashable
+from typing import Optional
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+async def gather_offset_pages(
+    fetch: Callable[[int, int], Awaitable[list[T]]],
+    size: int,
+    concurrency: int = 4,
+    key: Optional[Callable[[T], Hashable]] = None,
+    max_items: Optional[int] = None,
+    start: int = 0
+) -> list[T]:
+    """
+    Fetch start/size paged lists with several windows in flight at once
+    :param fetch: function(start, size) -> list returning one window of the list
+    :param size: size of the windows
+    :param concurrency: how many windows can be fetched at the same time
+    :param key: function(item) -> primary key used to drop duplicates (None keeps all items)
+    :param max_items: stop after this many items
+    :param start: offset of the first window
+    :return: items of all windows in list order
+    """
+    pages: dict[int, list[T]] = {}
+    next_index = 0
+    last_index: Optional[int] = None
+
+    async def worker():
+        nonlocal next_index, last_index
+        while True:
+            index = next_index
+            if last_index is not None and index > last_index: return
+            if max_items is not None and index * size >= max_items: return
+            next_index += 1
+            page = await fetch(start + index * size, size)
+            pages[index] = page
+            if len(page) < size and (last_index is None or index < last_index): last_index = index
+
+    workers = [create_task(worker()) for _ in range(max(concurrency, 1))]
+    try:
+        await gather(*workers)
+    except BaseException:
+        for task in workers: task.cancel()
+        raise
+
+    result, seen = [], set()
+    for index in sorted(pages):
+        if last_index is not None and index > last_index: break
+        for item in pages[index]:
+            if key is not None:
+                item_key = key(item)
+                if item_key in seen: continue
+                seen.add(item_key)
+            result.append(item)
+    return result if max_items is None else result[:max_items]
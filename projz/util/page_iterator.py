@@ -0,0 +1,92 @@
+from ..model import PaginatedList
+from asyncio import CancelledError
+from asyncio import Queue
+from asyncio import Task
+from asyncio import create_task
+from typing import Awaitable
+from typing import Callable
+from typing import Generic
+from typing import Optional
+from typing import TypeVar
+
+T = TypeVar("T")
+_END = object()
+
+
+class PageIterator(Generic[T]):
+    def __init__(
+        self,
+        fetch: Callable[[Optional[str]], Awaitable[PaginatedList]],
+        prefetch: int = 1,
+        max_items: Optional[int] = None,
+        page_token: Optional[str] = None
+    ):
+        self.fetch = fetch
+        self.prefetch = max(prefetch, 1)
+        self.max_items = max_items
+        self.page_token = page_token
+        self.pages_fetched = 0
+        self.items_yielded = 0
+        self._queue: Optional[Queue] = None
+        self._producer: Optional[Task] = None
+        self._page: list = []
+        self._index = 0
+        self._finished = False
+
+    def __aiter__(self) -> "PageIterator[T]":
+        return self
+
+    async def __anext__(self) -> T:
+        if self.max_items is not None and self.items_yielded >= self.max_items:
+            await self.aclose()
+        while self._index >= len(self._page):
+            if self._finished: raise StopAsyncIteration
+            if self._producer is None: self._start()
+            page = await self._queue.get()
+            if page is _END or isinstance(page, BaseException):
+                self._finished = True
+                if page is _END: raise StopAsyncIteration
+                raise page
+            self._page, self._index = page, 0
+        item = self._page[self._index]
+        self._index += 1
+        self.items_yielded += 1
+        return item
+
+    async def __aenter__(self) -> "PageIterator[T]":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        self._finished = True
+        self._page, self._index = [], 0
+        if self._producer is not None and not self._producer.done():
+            self._producer.cancel()
+            try: await self._producer
+            except CancelledError: pass
+
+    def _start(self) -> None:
+        self._queue = Queue(maxsize=self.prefetch)
+        self._producer = create_task(self._produce())
+
+    async def _produce(self) -> None:
+        page_token, produced, seen_tokens = self.page_token, 0, set()
+        try:
+            while True:
+                page = await self.fetch(page_token)
+                self.pages_fetched += 1
+                if len(page) == 0: break
+                await self._queue.put(page)
+                produced += len(page)
+                if self.max_items is not None and produced >= self.max_items: break
+                page_token = page.next_page_token
+                if not page_token or page_token in seen_tokens: break
+                seen_tokens.add(page_token)
+        except CancelledError:
+            raise
+        except Exception as e:
+            await self._queue.put(e)
+            return
+        await self._queue.put(_END)
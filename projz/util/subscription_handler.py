@@ -1,41 +1,182 @@
+from .handler_pool import HandlerPool
 from typing import Callable
 from typing import Any
+from typing import Optional
 from inspect import iscoroutinefunction
 from asyncio import create_task
-from random import randint
+from itertools import count
 
+_REJECTED = object()
+# Declarative filters are indexed by the first of these attributes that they constrain.
+_INDEXED_ATTRIBUTES = ("content", "thread_id", "uid", "type")
 
-class SubscriptionHandler:
+
+class _Subscription:
+    __slots__ = ("id", "order", "handler", "is_coroutine", "filter", "transform", "content_type", "conditions",
+                 "prefix", "index")
+
+    def __init__(
+        self,
+        subscription_id: str,
+        order: int,
+        handler: Callable[[Any], Any],
+        content_filter: Optional[Callable[[Any], bool]],
+        content_transform: Optional[Callable[[Any], Any]],
+        content_type: Optional[type],
+        conditions: dict[str, Any],
+        prefix: Optional[str]
+    ):
+        self.id = subscription_id
+        self.order = order
+        self.handler = handler
+        self.is_coroutine = iscoroutinefunction(handler)
+        self.filter = content_filter
+        self.transform = content_transform
+        self.content_type = content_type
+        self.conditions = conditions
+        self.prefix = prefix
+        self.index: Optional[tuple[str, Any]] = None
+
+    def accept(self, content: Any) -> Any:
+        if self.content_type is not None and not isinstance(content, self.content_type): return _REJECTED
+        for attribute, expected in self.conditions.items():
+            if getattr(content, attribute, None) != expected: return _REJECTED
+        if self.prefix is not None:
+            text = getattr(content, "content", None)
+            if not isinstance(text, str) or not text.startswith(self.prefix): return _REJECTED
+        if self.transform is not None: content = self.transform(content)
+        if self.filter is not None and not self.filter(content): return _REJECTED
+        return content
+
+
+class _PrefixTrie:
     def __init__(self):
-        self._subscriptions = []
+        self.root: dict = {}
+        self.size = 0
+
+    def add(self, prefix: str, subscription: _Subscription) -> None:
+        node = self.root
+        for char in prefix: node = node.setdefault(char, {})
+        # Single characters are the edges, so the empty string is free to hold the subscriptions of the node.
+        node.setdefault("", []).append(subscription)
+        self.size += 1
+
+    def remove(self, prefix: str, subscription: _Subscription) -> None:
+        path, node = [], self.root
+        for char in prefix:
+            path.append((node, char))
+            node = node[char]
+        node[""].remove(subscription)
+        if not node[""]: del node[""]
+        for parent, char in reversed(path):
+            if parent[char]: break
+            del parent[char]
+        self.size -= 1
+
+    def match(self, text: str) -> list[_Subscription]:
+        node, matched = self.root, list(self.root.get("", ()))
+        for char in text:
+            node = node.get(char)
+            if node is None: break
+            subscriptions = node.get("")
+            if subscriptions: matched.extend(subscriptions)
+        return matched
+
+
+class SubscriptionHandler:
+    def __init__(self, handler_pool: Optional[HandlerPool] = None):
+        self.handler_pool = handler_pool
+        self._subscriptions: dict[str, _Subscription] = {}
+        self._ids = count(1)
+        self._unindexed: list[_Subscription] = []
+        self._indexes: dict[str, dict[Any, list[_Subscription]]] = {attribute: {} for attribute in _INDEXED_ATTRIBUTES}
+        self._prefixes = _PrefixTrie()
 
     def subscribe(
         self,
         handler: Callable[[Any], Any],
-        content_filter: Callable[[Any], bool] = lambda _: True,
-        content_transform: Callable[[Any], Any] = lambda x: x
+        content_filter: Optional[Callable[[Any], bool]] = None,
+        content_transform: Optional[Callable[[Any], Any]] = None,
+        *,
+        content_type: Optional[type] = None,
+        thread_id: Optional[int] = None,
+        message_type: Optional[int] = None,
+        uid: Optional[int] = None,
+        content: Optional[str] = None,
+        prefix: Optional[str] = None
     ) -> str:
-        subscription_id = str(randint(1, 1000000))
-        self._subscriptions.append({
-            "id": subscription_id,
-            "handler": handler,
-            "filter": content_filter,
-            "transform": content_transform
-        })
+        order = next(self._ids)
+        subscription_id = str(order)
+        conditions = {
+            attribute: value for attribute, value in (
+                ("content", content), ("thread_id", thread_id), ("uid", uid), ("type", message_type)
+            ) if value is not None
+        }
+        subscription = _Subscription(
+            subscription_id, order, handler, content_filter, content_transform, content_type, conditions, prefix
+        )
+        # An exact content is the most selective key, then the prefix, then the remaining attributes.
+        attribute = next((attribute for attribute in _INDEXED_ATTRIBUTES if attribute in conditions), None)
+        if prefix is not None and attribute != "content":
+            self._prefixes.add(prefix, subscription)
+        elif attribute is not None:
+            value = conditions.pop(attribute)
+            subscription.index = (attribute, value)
+            self._indexes[attribute].setdefault(value, []).append(subscription)
+        else:
+            self._unindexed.append(subscription)
+        self._subscriptions[subscription_id] = subscription
         return subscription_id
 
     def unsubscribe(self, subscription_id: str) -> bool:
-        try:
-            self._subscriptions.remove(next(handler for handler in self._subscriptions if handler["id"] == subscription_id))
-            return True
-        except (StopIteration, ValueError):
-            return False
+        subscription = self._subscriptions.pop(subscription_id, None)
+        if subscription is None: return False
+        if subscription.index is not None:
+            attribute, value = subscription.index
+            bucket = self._indexes[attribute][value]
+            bucket.remove(subscription)
+            if not bucket: del self._indexes[attribute][value]
+        elif subscription.prefix is not None:
+            self._prefixes.remove(subscription.prefix, subscription)
+        else:
+            self._unindexed.remove(subscription)
+        return True
+
+    def _matches(self, content: Any) -> list[_Subscription]:
+        candidates = self._unindexed
+        sources = 1
+        for attribute, index in self._indexes.items():
+            if not index: continue
+            try: bucket = index.get(getattr(content, attribute, None))
+            except TypeError: continue
+            if not bucket: continue
+            candidates = candidates + bucket
+            sources += 1
+        if self._prefixes.size:
+            text = getattr(content, "content", None)
+            if isinstance(text, str):
+                matched = self._prefixes.match(text)
+                if matched:
+                    candidates = candidates + matched
+                    sources += 1
+        # Handlers are called in subscription order, whatever index they were found through.
+        if sources > 1: return sorted(candidates, key=lambda subscription: subscription.order)
+        return list(candidates)
 
     def broadcast(self, content: Any):
-        for subscription in self._subscriptions:
-            transformed_content = subscription["transform"](content)
-            if not subscription["filter"](transformed_content):
-                continue
-            create_task(subscription["handler"](transformed_content)) \
-                if iscoroutinefunction(subscription["handler"]) \
-                else subscription["handler"](transformed_content)
+        for subscription in self._matches(content):
+            value = subscription.accept(content)
+            if value is _REJECTED: continue
+            if not subscription.is_coroutine: subscription.handler(value)
+            elif self.handler_pool is None: create_task(subscription.handler(value))
+            else: self.handler_pool.submit_nowait(getattr(content, "thread_id", None), subscription.handler, value)
+
+    async def publish(self, content: Any):
+        # Unlike broadcast, waits for room in the handler pool when its overflow policy is BLOCK.
+        # The websocket reader uses broadcast, it also has to read the ACKs the handlers wait for.
+        if self.handler_pool is None: return self.broadcast(content)
+        for subscription in self._matches(content):
+            value = subscription.accept(content)
+            if value is _REJECTED: continue
+            if not subscription.is_coroutine: subscription.handler(value)
+            else: await self.handler_pool.submit(getattr(content, "thread_id", None), subscription.handler, value)
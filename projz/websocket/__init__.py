@@ -1 +1,2 @@
 from .websocket_listener import WebsocketListener
+from .ack_tracker import AckTracker
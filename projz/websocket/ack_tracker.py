@@ -0,0 +1,81 @@
+from ..error import ApiException
+from ..error import AckTimeout
+from ..util import LatencyRecorder
+from asyncio import Future
+from asyncio import Semaphore
+from asyncio import TimerHandle
+from asyncio import get_running_loop
+from time import monotonic
+from typing import Optional
+
+
+class AckTracker:
+    def __init__(self, timeout: float = 15, max_in_flight: int = 64):
+        self.timeout = timeout
+        self.max_in_flight = max_in_flight
+        self.pending: dict[int, tuple[Future, float, TimerHandle]] = {}
+        self.rtt = LatencyRecorder()
+        self.acknowledged = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._window = Semaphore(max_in_flight)
+
+    async def track(self, seq_id: int, timeout: Optional[float] = None) -> Future:
+        # Waits while max_in_flight frames are unacknowledged, the slot is released when the returned future completes.
+        await self._window.acquire()
+        if seq_id in self.pending:
+            self._window.release()
+            raise ValueError(f"Frame with seq id {seq_id} is already waiting for an ACK")
+        loop = get_running_loop()
+        future = loop.create_future()
+        timer = loop.call_later(self.timeout if timeout is None else timeout, self._expire, seq_id)
+        self.pending[seq_id] = (future, monotonic(), timer)
+        future.add_done_callback(lambda done: self._release(seq_id, done))
+        return future
+
+    def resolve(self, ack: dict) -> bool:
+        entry = self.pending.get(ack.get("seqId"))
+        if entry is None: return False
+        future, sent_at, _ = entry
+        # An expired, cancelled or failed frame stays pending until its done callback runs on the next iteration.
+        if future.done(): return False
+        self.rtt.record(monotonic() - sent_at)
+        if ack.get("apiCode") != 0:
+            self.rejected += 1
+            future.set_exception(ApiException.get(ack))
+        else:
+            self.acknowledged += 1
+            future.set_result(ack)
+        return True
+
+    def fail(self, seq_id: int, exception: BaseException) -> None:
+        entry = self.pending.get(seq_id)
+        if entry is not None and not entry[0].done(): entry[0].set_exception(exception)
+
+    def fail_all(self, exception: BaseException) -> None:
+        for future, _, _ in list(self.pending.values()):
+            if not future.done(): future.set_exception(exception)
+
+    def _expire(self, seq_id: int) -> None:
+        entry = self.pending.get(seq_id)
+        if entry is None or entry[0].done(): return
+        self.timed_out += 1
+        entry[0].set_exception(AckTimeout(f"No ACK for the frame with seq id {seq_id}"))
+
+    def _release(self, seq_id: int, future: Future) -> None:
+        entry = self.pending.get(seq_id)
+        if entry is None or entry[0] is not future: return
+        del self.pending[seq_id]
+        entry[2].cancel()
+        self._window.release()
+        # Nobody may be awaiting a failed frame anymore, so its exception is marked as retrieved here.
+        if not future.cancelled(): future.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self.pending),
+            "acknowledged": self.acknowledged,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "rtt": self.rtt.stats()
+        }
@@ -1,99 +1,301 @@
+from .ack_tracker import AckTracker
 from ..api import RequestManager
-from ..error import ApiException
+from ..error import WebsocketDisconnected
 from ..enum import EWebSocketEventType
 from ..util import SubscriptionHandler
-from ..model import ChatMessage
+from ..util import HandlerPool
+from ..util import LatencyRecorder
+from ..model import LazyChatMessage
+from ..model import PaginatedList
 from aiohttp import ClientSession
 from aiohttp import ClientWebSocketResponse
+from aiohttp import ClientError
 from aiohttp import WSMsgType
+from asyncio import CancelledError
+from asyncio import Future
+from asyncio import TimeoutError
 from asyncio import create_task
 from asyncio import sleep
+from asyncio import wait_for
 from asyncio import get_running_loop
+from collections import OrderedDict
+from random import uniform
+from re import compile
+from time import monotonic
+from typing import Awaitable
+from typing import Callable
 from typing import Optional
-from ujson import loads
-from ujson import dumps
 from datetime import datetime
 
+_CLOSED_TYPES = (WSMsgType.CLOSE, WSMsgType.CLOSING, WSMsgType.CLOSED, WSMsgType.ERROR)
+_PING_FRAME = '{"t":8}'
+_THREAD_ID = compile(r'"threadId":\s*(\d+)')
+_MAX_PROBES = 16
+_CLOSE_TIMEOUT = 2
+
 
 class WebsocketListener(SubscriptionHandler):
     def __init__(
         self,
         request_manager: RequestManager,
-        logging: bool = False
+        logging: bool = False,
+        handler_pool: Optional[HandlerPool] = None,
+        reconnect: bool = True,
+        reconnect_delay: float = 0.5,
+        max_reconnect_delay: float = 30,
+        backfill: Optional[Callable[[int, int, Optional[str]], Awaitable[PaginatedList]]] = None,
+        backfill_limit: int = 100,
+        dedupe_size: int = 4096,
+        ack_timeout: float = 15,
+        max_in_flight: int = 64,
+        ping_interval: float = 3,
+        liveness_timeout: Optional[float] = 15,
+        keepalive_interval: Optional[float] = 3
     ):
-        super().__init__()
+        super().__init__(handler_pool)
         self.request_manager = request_manager
         self.provider = request_manager.provider
         self.language = request_manager.language
         self.country_code = request_manager.country_code
         self.time_zone = request_manager.time_zone
         self.device_id = request_manager.device_id
+        self.json_codec = request_manager.json_codec
         self.connection: ClientWebSocketResponse = None
         self.task_receiver = None
         self.task_pinger = None
         self.client_session = None
         self.logging = logging
-        self.outgoing = {}
+        self.ack_tracker = AckTracker(ack_timeout, max_in_flight)
+        self.reconnect = reconnect
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.backfill = backfill
+        self.backfill_limit = backfill_limit
+        self.dedupe_size = dedupe_size
+        self.reconnects = 0
+        self.backfilled = 0
+        self.last_message_ids: dict[int, int] = {}
+        self._seen_messages: OrderedDict[tuple[int, int], None] = OrderedDict()
+        self._echoes: dict[int, Future] = {}
+        self.ping_interval = ping_interval
+        self.liveness_timeout = liveness_timeout
+        self.keepalive_interval = keepalive_interval
+        self.rtt = LatencyRecorder(256)
+        self.last_received = 0.0
+        self.last_sent = 0.0
+        self.dead_connections = 0
+        self._probes: OrderedDict[bytes, float] = OrderedDict()
+        self._probe_counter = 0
+        self.shard: Optional[tuple[int, int]] = None
+        self.received = 0
+        self.skipped = 0
 
     def _log(self, log_type: str, message_type: int, content_length: int):
         log_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         print(f"[WebSocket {log_time}] [{log_type}] [{message_type}] [{content_length} bytes]")
 
-    async def connect(self):
-        self.client_session = ClientSession(base_url="wss://ws.projz.com")
+    async def _open(self):
+        if self.client_session is None:
+            self.client_session = ClientSession(
+                base_url="wss://ws.projz.com",
+                connector=self.request_manager.get_connector(),
+                connector_owner=False
+            )
+        # The headers are signed again for every connection, so the nonce and reqTime are always fresh.
+        # Pings are answered by receive, which lets it time the PONGs of the probes sent by ping.
         self.connection = await self.client_session.ws_connect(
             "/v1/chat/ws",
-            headers=await self.request_manager.build_headers("/v1/chat/ws")
+            headers=await self.request_manager.build_headers("/v1/chat/ws"),
+            autoping=False
         )
+        self.last_received = monotonic()
+        self._probes.clear()
+
+    async def connect(self):
+        await self._open()
         self.task_receiver = create_task(self.receive())
         self.task_pinger = create_task(self.ping())
 
     async def disconnect(self):
         self.task_receiver.cancel()
         self.task_pinger.cancel()
-        await self.connection.close()
+        if self.connection is not None: await self.connection.close()
         self.connection = None
+        self._fail_outgoing()
         await self.client_session.close()
         self.client_session = None
 
+    def _fail_outgoing(self):
+        self.ack_tracker.fail_all(WebsocketDisconnected("The websocket connection was lost"))
+
+    async def _reconnect(self):
+        self._fail_outgoing()
+        delay = self.reconnect_delay
+        while True:
+            if self.connection is not None and not self.connection.closed:
+                # A dead peer never answers the close frame, a timed out close drops the transport instead.
+                try: await wait_for(self.connection.close(), _CLOSE_TIMEOUT)
+                except (TimeoutError, ClientError, OSError): pass
+            try:
+                await self._open()
+                break
+            except (ClientError, OSError, TimeoutError) as e:
+                if self.logging: print(f"[WebSocket] Reconnect failed: {e!r}")
+            # Full jitter keeps many clients from reconnecting in lockstep after a server restart.
+            await sleep(uniform(0, delay))
+            delay = min(delay * 2, self.max_reconnect_delay)
+        self.reconnects += 1
+        if self.backfill is not None:
+            try: await self._backfill()
+            except CancelledError: raise
+            except Exception as e:
+                get_running_loop().call_exception_handler({"message": "Websocket backfill failed", "exception": e})
+
+    async def _backfill(self):
+        for thread_id, last_message_id in list(self.last_message_ids.items()):
+            missed, page_token = [], None
+            while len(missed) < self.backfill_limit:
+                page = await self.backfill(thread_id, min(self.backfill_limit, 100), page_token)
+                reached = False
+                for message in page:
+                    if message.message_id == last_message_id or (thread_id, message.message_id) in self._seen_messages:
+                        reached = True
+                        break
+                    missed.append(message)
+                page_token = page.next_page_token
+                if reached or not page or not page_token: break
+            # The server returns the newest messages first.
+            for message in reversed(missed[:self.backfill_limit]):
+                if not self._remember(message.thread_id, message.message_id): continue
+                self.backfilled += 1
+                self.broadcast(message)
+
+    def _remember(self, thread_id: Optional[int], message_id: Optional[int]) -> bool:
+        if thread_id is None or message_id is None: return True
+        key = (thread_id, message_id)
+        if key in self._seen_messages: return False
+        self._seen_messages[key] = None
+        if len(self._seen_messages) > self.dedupe_size: self._seen_messages.popitem(last=False)
+        self.last_message_ids[thread_id] = message_id
+        return True
+
+    def _foreign_thread(self, data: str) -> bool:
+        # Every threadId in the frame belongs to another shard: the frame can be skipped without parsing it.
+        # ACKs are always parsed, a handler may send to a thread of another shard.
+        if "serverAck" in data: return False
+        thread_ids = _THREAD_ID.findall(data)
+        return bool(thread_ids) and all(int(thread_id) % self.shard[1] != self.shard[0] for thread_id in thread_ids)
+
+    def expect_echo(self, seq_id: int) -> Future:
+        future = get_running_loop().create_future()
+        self._echoes[seq_id] = future
+        return future
+
+    def forget_echo(self, seq_id: int):
+        self._echoes.pop(seq_id, None)
+
     async def receive(self):
         while True:
-            msg = await self.connection.receive()
+            # Nothing at all, not even a PONG, for liveness_timeout seconds means that the connection is dead.
+            try: msg = await self.connection.receive(self.liveness_timeout)
+            except TimeoutError:
+                self.dead_connections += 1
+                msg = None
+            except (ClientError, OSError): msg = None
+            if msg is None or msg.type in _CLOSED_TYPES:
+                if not self.reconnect: return
+                await self._reconnect()
+                continue
+            self.last_received = monotonic()
+            if msg.type == WSMsgType.PING:
+                await self.connection.pong(msg.data)
+                continue
+            if msg.type == WSMsgType.PONG:
+                sent_at = self._probes.pop(msg.data, None)
+                if sent_at is not None: self.rtt.record(self.last_received - sent_at)
+                continue
             if msg.type != WSMsgType.TEXT: continue
-            msg_json = loads(msg.data)
+            if self.shard is not None and self._foreign_thread(msg.data):
+                self.skipped += 1
+                continue
+            msg_json = self.json_codec.loads(msg.data)
             if self.logging:
                 self._log("INCOMING", msg_json["t"], len(msg.data))
             if msg_json["t"] == EWebSocketEventType.MESSAGE.value:
-                self.broadcast(ChatMessage.from_dict(msg_json["msg"]))
-            elif msg_json["t"] == EWebSocketEventType.ACK.value:
-                ack = msg_json["serverAck"]
-                if ack["seqId"] not in self.outgoing: continue
-                if ack["apiCode"] != 0:
-                    self.outgoing[ack["seqId"]].set_exception(ApiException.get(ack))
+                message = msg_json["msg"]
+                # With a shard set, messages of the other threads are left to the processes that own them.
+                if self.shard is not None and (message.get("threadId") or 0) % self.shard[1] != self.shard[0]:
+                    self.skipped += 1
                     continue
-                self.outgoing[ack["seqId"]].set_result(ack)
-                del self.outgoing[ack["seqId"]]
+                if not self._remember(message.get("threadId"), message.get("messageId")): continue
+                self.received += 1
+                message = LazyChatMessage(message)
+                echo = self._echoes.pop(message.raw.get("seqId"), None)
+                if echo is not None and not echo.done(): echo.set_result(message)
+                # The reader must never wait for the handlers: a handler that sends a message waits for an ACK,
+                # and only this loop can read it. A full handler queue drops a message instead.
+                self.broadcast(message)
+            elif msg_json["t"] == EWebSocketEventType.ACK.value:
+                self.ack_tracker.resolve(msg_json["serverAck"])
 
     async def ping(self):
         while True:
-            await sleep(3)
-            await self.send_request(8)
+            await sleep(self.ping_interval)
+            if self.connection is None or self.connection.closed: continue
+            try:
+                # The type-8 frame keeps the session of the server alive, any other outgoing frame does that as well,
+                # so busy connections skip it. None leaves only the probe, which checks the connection.
+                if self.keepalive_interval is not None and monotonic() - self.last_sent >= self.keepalive_interval:
+                    await self._send(8, _PING_FRAME)
+                await self._probe()
+            except (ClientError, ConnectionError): continue
+
+    async def _probe(self):
+        self._probe_counter += 1
+        payload = self._probe_counter.to_bytes(8, "big")
+        self._probes[payload] = monotonic()
+        if len(self._probes) > _MAX_PROBES: self._probes.popitem(last=False)
+        await self.connection.ping(payload)
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connection is not None and not self.connection.closed,
+            "silent_for": monotonic() - self.last_received if self.last_received else None,
+            "received": self.received,
+            "skipped": self.skipped,
+            "reconnects": self.reconnects,
+            "dead_connections": self.dead_connections,
+            "backfilled": self.backfilled,
+            "rtt": self.rtt.stats(),
+            "ack": self.ack_tracker.stats()
+        }
 
     async def send_request(
         self,
         request_type: int,
         wait_response: bool = False,
         seq_id: Optional[int] = None,
+        ack_timeout: Optional[float] = None,
         **kwargs
     ) -> Optional[dict]:
-        data = dumps(dict(t=request_type, **kwargs))
+        data = self.json_codec.dumps_str(dict(t=request_type, **kwargs))
+        if not wait_response:
+            await self._send(request_type, data)
+            return None
+        if seq_id is None: raise ValueError("Can't wait for response without seq id parameter")
+        # The future is registered before sending, so an ACK that arrives during the send is not missed.
+        future = await self.ack_tracker.track(seq_id, ack_timeout)
+        try:
+            await self._send(request_type, data)
+        except BaseException as e:
+            self.ack_tracker.fail(seq_id, e)
+            raise
+        return await future
+
+    async def _send(self, request_type: int, data: str):
         if self.logging:
             self._log("OUTGOING", request_type, len(data))
+        if self.connection is None or self.connection.closed:
+            raise WebsocketDisconnected("The websocket connection is closed")
         await self.connection.send_str(data)
-        if wait_response:
-            if seq_id is None: raise ValueError("Can't wait for response without seq id parameter")
-            future = get_running_loop().create_future()
-            self.outgoing[seq_id] = future
-            return await future
-        return None
-
+        self.last_sent = monotonic()
@@ -44,6 +44,7 @@ def main():
         packages=find_packages(),
         author_email="ktoya170214@gmail.com",
         install_requires=get_requirements(),
+        extras_require={"fast": ["orjson"]},
         long_description=get_readme(),
         long_description_content_type="text/markdown",
         python_requires=">=3.7",
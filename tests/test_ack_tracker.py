@@ -0,0 +1,45 @@
+from asyncio import CancelledError
+from asyncio import run
+from asyncio import sleep
+from projz.error import AckTimeout
+from projz.websocket import AckTracker
+import pytest
+
+
+def test_resolve_after_expiry_in_same_iteration():
+    async def main():
+        tracker = AckTracker(timeout=10)
+        future = await tracker.track(1)
+        tracker._expire(1)
+        # The done callback has not run yet, the entry is still pending.
+        assert 1 in tracker.pending
+        assert tracker.resolve({"seqId": 1, "apiCode": 0}) is False
+        tracker.fail(1, ConnectionError())
+        with pytest.raises(AckTimeout): await future
+        await sleep(0)
+        assert not tracker.pending
+    run(main())
+
+
+def test_resolve_after_cancel_and_fail_all():
+    async def main():
+        tracker = AckTracker(timeout=10)
+        cancelled = await tracker.track(1)
+        failed = await tracker.track(2)
+        cancelled.cancel()
+        tracker.fail_all(ConnectionError())
+        assert tracker.resolve({"seqId": 1, "apiCode": 0}) is False
+        assert tracker.resolve({"seqId": 2, "apiCode": 0}) is False
+        with pytest.raises(CancelledError): await cancelled
+        with pytest.raises(ConnectionError): await failed
+    run(main())
+
+
+def test_resolve():
+    async def main():
+        tracker = AckTracker(timeout=10)
+        future = await tracker.track(1)
+        assert tracker.resolve({"seqId": 1, "apiCode": 0}) is True
+        assert (await future)["seqId"] == 1
+        assert tracker.stats()["acknowledged"] == 1
+    run(main())
@@ -0,0 +1,13 @@
+from asyncio import run
+from projz import ClientPool
+
+
+def test_next_client_starts_with_the_first_account():
+    async def main():
+        pool = ClientPool()
+        clients = [pool.add(name) for name in ("a", "b", "c")]
+        picked = [pool.next_client() for _ in range(4)]
+        await pool.aclose()
+        return clients, picked
+    clients, picked = run(main())
+    assert picked == clients + clients[:1]
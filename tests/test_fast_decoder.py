@@ -0,0 +1,99 @@
+from dataclasses import MISSING
+from dataclasses import fields
+from dataclasses import is_dataclass
+from dataclasses_json import DataClassJsonMixin
+from datetime import datetime
+from inspect import isclass
+from projz.model.parse import get_decoder
+from random import Random
+from typing import Union
+from typing import get_args
+from typing import get_origin
+from typing import get_type_hints
+import projz.model
+import pytest
+import warnings
+
+_CASES_PER_CLASS = 200
+_WALLET_AMOUNTS = ("amount", "balance_value", "claimed_amount")
+
+
+def _model_classes() -> list[type]:
+    classes = []
+
+    def walk(cls: type):
+        if cls in classes: return
+        classes.append(cls)
+        for value in vars(cls).values():
+            if isclass(value) and is_dataclass(value): walk(value)
+
+    for name in dir(projz.model):
+        value = getattr(projz.model, name)
+        if isclass(value) and is_dataclass(value) and hasattr(value, "dataclass_json_config"): walk(value)
+    return classes
+
+
+def _key(cls: type, field) -> str:
+    config = dict(getattr(cls, "dataclass_json_config", None) or {})
+    config.update(field.metadata.get("dataclasses_json", {}))
+    letter_case = config.get("letter_case")
+    return letter_case(field.name) if letter_case is not None else field.name
+
+
+def _value(random: Random, field_type, depth: int):
+    origin, args = get_origin(field_type), get_args(field_type)
+    if origin is Union:
+        if random.random() < 0.3: return None
+        return _value(random, next(arg for arg in args if arg is not type(None)), depth)
+    if is_dataclass(field_type): return _document(random, field_type, depth + 1) if depth < 4 else None
+    if field_type is int: return random.choice([1, 2 ** 40, "7", True, 0])
+    if field_type is str: return random.choice(["a", "", 5])
+    if field_type is bool: return random.choice([True, False, 1, 0])
+    if field_type is float: return 1.5
+    if field_type is datetime: return random.choice([1690000000, 1690000000000, "2023-01-01T00:00:00Z"])
+    if origin is list or field_type is list:
+        return [_value(random, args[0], depth) for _ in range(random.randint(0, 3))] if args else [1, "x"]
+    if origin is dict or field_type is dict: return {"k": _value(random, args[1], depth) if args else {"x": 1}}
+    return None
+
+
+def _document(random: Random, cls: type, depth: int = 0) -> dict:
+    hints = get_type_hints(cls)
+    document = {}
+    for field in fields(cls):
+        has_default = field.default is not MISSING or field.default_factory is not MISSING
+        if has_default and random.random() < 0.15: continue
+        if field.name in _WALLET_AMOUNTS:
+            document[_key(cls, field)] = random.choice(["0", "5000000000000000000000"])
+            continue
+        document[_key(cls, field)] = _value(random, hints[field.name], depth)
+    if random.random() < 0.1: document["unknownExtra"] = 1
+    # A snake_case key is mapped onto the field by dataclasses_json as well.
+    if random.random() < 0.03 and fields(cls): document[fields(cls)[0].name] = None
+    return document
+
+
+def _decode(decode, document: dict):
+    try: return True, decode(document)
+    except Exception as e: return False, e
+
+
+@pytest.mark.parametrize("cls", _model_classes(), ids=lambda cls: cls.__qualname__)
+def test_compiled_decoder_matches_from_dict(cls: type):
+    random = Random(cls.__qualname__)
+    decode = get_decoder(cls)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for _ in range(_CASES_PER_CLASS):
+            document = _document(random, cls)
+            expected_ok, expected = _decode(lambda data: DataClassJsonMixin.from_dict.__func__(cls, data), document)
+            actual_ok, actual = _decode(decode, document)
+            # Documents that dataclasses_json rejects have to be rejected as well, the exception type may differ.
+            assert actual_ok == expected_ok, document
+            if expected_ok:
+                assert actual == expected, document
+                assert repr(actual) == repr(expected), document
+
+
+def test_all_models_are_covered():
+    assert len(_model_classes()) >= 50
@@ -0,0 +1,32 @@
+from dataclasses_json import DataClassJsonMixin
+from projz.model import LazyChatMessage
+from projz.model.parse import get_encoder
+from projz.util import OrjsonCodec
+from projz.util import UjsonCodec
+from random import Random
+from test_fast_decoder import _document
+from test_fast_decoder import _model_classes
+import pytest
+import warnings
+
+_CASES_PER_CLASS = 100
+
+
+@pytest.mark.parametrize("cls", _model_classes(), ids=lambda cls: cls.__qualname__)
+def test_compiled_encoder_matches_to_dict(cls: type):
+    random = Random(cls.__qualname__)
+    encode = get_encoder(cls)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for _ in range(_CASES_PER_CLASS):
+            try: model = DataClassJsonMixin.from_dict.__func__(cls, _document(random, cls))
+            except Exception: continue
+            assert encode(model) == model.to_dict(encode_json=False)
+
+
+def test_codecs_dump_models_like_to_json():
+    message = LazyChatMessage({"threadId": 1, "messageId": 2, "content": "hi", "createdTime": 1690000000,
+                               "author": {"uid": 3, "nickname": "n"}, "extensions": {"a": [1]}})
+    expected = UjsonCodec().loads(message.to_json())
+    for codec in (UjsonCodec(), OrjsonCodec()):
+        assert codec.loads(codec.dumps_model(message)) == expected
@@ -0,0 +1,34 @@
+from projz import Client
+from projz.model import IdentityMap
+from projz.model import User
+from projz.model.parse import get_decoder
+
+
+def _decode(identity_map: IdentityMap, data: dict) -> User:
+    with identity_map.active(): return get_decoder(User)(data)
+
+
+def test_changed_document_is_decoded_again():
+    identity_map = IdentityMap()
+    user = _decode(identity_map, {"uid": 1, "nickname": "old"})
+    assert _decode(identity_map, {"uid": 1, "nickname": "old"}) is user
+    changed = _decode(identity_map, {"uid": 1, "nickname": "new"})
+    assert changed is not user
+    assert changed.nickname == "new"
+    assert _decode(identity_map, {"uid": 1, "nickname": "new"}) is changed
+
+
+def test_covered_document_shares_the_instance():
+    identity_map = IdentityMap()
+    user = _decode(identity_map, {"uid": 1, "nickname": "n", "bio": "b"})
+    assert _decode(identity_map, {"uid": 1, "nickname": "n"}) is user
+    assert _decode(identity_map, {"uid": 1, "nickname": "n", "bio": "b", "gender": 1}) is not user
+
+
+def test_invalidate_cache_clears_the_identity_map():
+    client = Client(identity_map=IdentityMap())
+    user = client._decode(User, {"uid": 1, "nickname": "n"})
+    assert len(client.identity_map) == 1
+    client.invalidate_cache("/v1/users/profile/1")
+    assert len(client.identity_map) == 0
+    assert client._decode(User, {"uid": 1, "nickname": "n"}) is not user
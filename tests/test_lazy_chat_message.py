@@ -0,0 +1,17 @@
+from dataclasses import replace
+from projz.model import ChatMessage
+from projz.model import LazyChatMessage
+
+RAW = {"threadId": 1, "messageId": 2, "uid": 3, "type": 1, "content": "hi", "author": {"uid": 3, "nickname": "n"}}
+
+
+def test_replace():
+    message = replace(LazyChatMessage(RAW), content="edited")
+    assert isinstance(message, LazyChatMessage)
+    assert message.content == "edited"
+    assert message == replace(ChatMessage.from_dict(RAW), content="edited")
+
+
+def test_to_dict():
+    assert LazyChatMessage(RAW).to_dict() == ChatMessage.from_dict(RAW).to_dict()
+    assert replace(LazyChatMessage(RAW), content="edited").to_dict()["content"] == "edited"
@@ -0,0 +1,37 @@
+from asyncio import run
+from projz import Client
+from projz.model import PaginatedList
+
+PAGES = {None: ([1, 2], "a"), "a": ([3], None)}
+
+
+class _Client(Client):
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+    async def _resolve_circle_reference(self, reference) -> int:
+        return 7
+
+    async def get(self, endpoint: str, params=None, web: bool = False, **kwargs) -> dict:
+        self.requests.append((endpoint, params))
+        items, next_page_token = PAGES[params.get("pageToken")]
+        return {"list": [{"uid": item, "circleId": item} for item in items], "pagination": {"nextPageToken": next_page_token}}
+
+
+async def _collect(iterator) -> list:
+    return [item async for item in iterator]
+
+
+def test_iter_circle_active_members():
+    client = _Client()
+    users = run(_collect(client.iter_circle_active_members("link", 2)))
+    assert [user.uid for user in users] == ["1", "2", "3"]
+    assert {endpoint for endpoint, _ in client.requests} == {"/v1/circles/7/active-members"}
+
+
+def test_iter_circles():
+    client = _Client()
+    circles = run(_collect(client.iter_circles("hot", 2, max_items=2)))
+    assert [circle.circle_id for circle in circles] == [1, 2]
+    assert client.requests[0] == ("/v1/circles", {"type": "hot", "size": 2, "categoryId": 0})
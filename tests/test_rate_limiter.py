@@ -0,0 +1,22 @@
+from asyncio import run
+from asyncio import wait_for
+from projz.api.util import RateLimiter
+import pytest
+
+
+def test_throttled_endpoint_without_a_limit_is_limited():
+    async def main():
+        limiter = RateLimiter(throttled_limit=(10, 1), recovery_time=0)
+        for _ in range(20): await limiter.acquire("account", "GET", "/v1/users/profile/1")
+        assert limiter.stats()["buckets"] == 0
+        limiter.penalize("account", "GET", "/v1/users/profile/1")
+        await wait_for(limiter.acquire("account", "GET", "/v1/users/profile/2"), 1)
+        assert limiter.stats()["waited"] == 1
+        # Other accounts are not affected.
+        await wait_for(limiter.acquire("other", "GET", "/v1/users/profile/1"), 0.01)
+        # The next token only comes after 0.1s.
+        with pytest.raises(TimeoutError): await wait_for(limiter.acquire("account", "GET", "/v1/users/profile/3"), 0.05)
+        return limiter.stats()
+    stats = run(main())
+    assert stats["throttled"] == 1
+    assert stats["buckets"] == 1
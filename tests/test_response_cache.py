@@ -0,0 +1,53 @@
+from asyncio import Event
+from asyncio import create_task
+from asyncio import run
+from projz.api import RequestManager
+from projz.api.headers import HeadersProvider
+from projz.api.util import ResponseCache
+
+
+def test_put_after_invalidation_is_skipped():
+    cache = ResponseCache()
+    generation = cache.generation
+    cache.invalidate("/v1/users/profile/1")
+    cache.put("user", "/v1/users/profile/1", "a", {"stale": True}, generation)
+    cache.put("user", "/v1/users/profile/2", "b", {"fresh": True}, generation)
+    assert cache.get("a") is None
+    assert cache.get("b") == {"fresh": True}
+
+
+def test_forgotten_invalidations_skip_older_puts():
+    cache = ResponseCache(max_size=2)
+    generation = cache.generation
+    for user_id in range(3): cache.invalidate(f"/v1/users/profile/{user_id}")
+    cache.put("user", "/v1/users/profile/5", "a", {}, generation)
+    assert cache.get("a") is None
+    cache.put("user", "/v1/users/profile/5", "a", {}, cache.generation)
+    assert cache.get("a") == {}
+
+
+class _RequestManager(RequestManager):
+    def __init__(self):
+        super().__init__(HeadersProvider(), cache=ResponseCache())
+        self.started = Event()
+        self.answer = Event()
+        self.version = 0
+
+    async def _perform(self, method, endpoint, body, content_type, web, nonce) -> dict:
+        version = self.version
+        self.started.set()
+        await self.answer.wait()
+        return {"version": version}
+
+
+def test_in_flight_answer_does_not_outlive_invalidation():
+    async def main():
+        request_manager = _RequestManager()
+        stale = create_task(request_manager.get("/v1/users/profile/1", cache_family="user"))
+        await request_manager.started.wait()
+        request_manager.version = 1
+        request_manager.invalidate_cache("/v1/users/profile/1")
+        request_manager.answer.set()
+        assert await stale == {"version": 0}
+        return await request_manager.get("/v1/users/profile/1", cache_family="user")
+    assert run(main()) == {"version": 1}
@@ -0,0 +1,76 @@
+from asyncio import run
+from asyncio import sleep
+from asyncio import wait_for
+from projz.api import RequestManager
+from projz.api.headers import HeadersProvider
+from projz.api.util import RetryPolicy
+from projz.error import BadResponse
+from projz.error import TooManyRequests
+from time import monotonic
+import pytest
+
+
+class _RequestManager(RequestManager):
+    def __init__(self, failures: list[Exception], **kwargs):
+        super().__init__(HeadersProvider(), coalesce_requests=False, **kwargs)
+        self.failures = failures
+        self.nonces = []
+
+    async def _perform(self, method, endpoint, body, content_type, web, nonce) -> dict:
+        self.nonces.append(nonce)
+        if self.failures: raise self.failures.pop(0)
+        return {"ok": True}
+
+
+def _policy() -> RetryPolicy:
+    return RetryPolicy(max_attempts=3, base_delay=0, max_delay=0)
+
+
+def test_retries_are_signed_with_fresh_nonces():
+    request_manager = _RequestManager([BadResponse(-1, ""), BadResponse(-1, "")], retry_policy=_policy())
+    assert run(request_manager.get("/v1/users/profile/1")) == {"ok": True}
+    assert len(request_manager.nonces) == 3
+    assert len(set(request_manager.nonces)) == 3
+
+
+def test_too_many_requests_is_not_retried():
+    request_manager = _RequestManager([TooManyRequests(-1, "")], retry_policy=_policy())
+    with pytest.raises(TooManyRequests): run(request_manager.get("/v1/users/profile/1"))
+    assert len(request_manager.nonces) == 1
+
+
+def test_requests_are_not_retried_by_default():
+    request_manager = _RequestManager([BadResponse(-1, "")])
+    with pytest.raises(BadResponse): run(request_manager.get("/v1/users/profile/1"))
+    assert len(request_manager.nonces) == 1
+
+
+def test_hung_attempt_is_cut_off_at_the_deadline():
+    attempts = []
+
+    async def call():
+        attempts.append(None)
+        await sleep(60)
+
+    async def main():
+        policy = RetryPolicy(max_attempts=3, base_delay=0, max_delay=0, deadline=0.1)
+        started_at = monotonic()
+        with pytest.raises(TimeoutError): await wait_for(policy.run(call), 2)
+        return monotonic() - started_at
+    assert run(main()) < 0.5
+    assert len(attempts) == 1
+
+
+def test_timed_out_attempt_is_retried_within_the_deadline():
+    attempts = []
+
+    async def call():
+        attempts.append(None)
+        if len(attempts) == 1: await wait_for(sleep(60), 0.05)
+        return "answer"
+
+    async def main():
+        policy = RetryPolicy(max_attempts=3, base_delay=0, max_delay=0, deadline=1)
+        return await wait_for(policy.run(call), 2)
+    assert run(main()) == "answer"
+    assert len(attempts) == 2
@@ -0,0 +1,131 @@
+from asyncio import Queue
+from asyncio import create_task
+from asyncio import run
+from asyncio import sleep
+from asyncio import wait_for
+from aiohttp import WSMessage
+from aiohttp import WSMsgType
+from projz.enum import EOverflowPolicy
+from projz.util import HandlerPool
+from projz.util import get_default_codec
+from projz.websocket import WebsocketListener
+from time import monotonic
+from ujson import dumps
+
+
+class _RequestManager:
+    provider = None
+    language = "en-US"
+    country_code = "us"
+    time_zone = 0
+    device_id = None
+    json_codec = get_default_codec()
+
+
+class _Connection:
+    closed = False
+
+    def __init__(self):
+        self.frames = Queue()
+        self.sent = []
+        self.pings = []
+
+    async def receive(self, timeout=None):
+        return await self.frames.get()
+
+    async def send_str(self, data):
+        self.sent.append(data)
+
+    async def ping(self, payload):
+        self.pings.append(payload)
+
+    def push(self, frame: dict):
+        self.frames.put_nowait(WSMessage(WSMsgType.TEXT, dumps(frame), None))
+
+
+def _message(message_id: int) -> dict:
+    return {"t": 1, "msg": {"threadId": 1, "messageId": message_id, "uid": 1, "type": 1, "content": "hi"}}
+
+
+async def _until(condition):
+    while not condition(): await sleep(0.01)
+
+
+def test_full_handler_queue_does_not_block_acks():
+    async def main():
+        pool = HandlerPool(workers=1, queue_size=1, overflow_policy=EOverflowPolicy.BLOCK)
+        listener = WebsocketListener(_RequestManager(), handler_pool=pool, reconnect=False)
+        connection = listener.connection = _Connection()
+        replies = []
+
+        async def handler(message):
+            # A reply waits for its ACK, which arrives after more messages than the queue can hold.
+            replies.append(await listener.send_request(1, True, message.message_id, msg={}))
+
+        listener.subscribe(handler)
+        receiver = create_task(listener.receive())
+        connection.push(_message(1))
+        await wait_for(_until(lambda: connection.sent), 2)
+        # The worker is busy with the first message, the second one fills the queue and the third one overflows.
+        for message_id in range(2, 4): connection.push(_message(message_id))
+        connection.push({"t": 2, "serverAck": {"seqId": 1, "apiCode": 0}})
+        await wait_for(_until(lambda: replies), 2)
+        assert replies[0]["seqId"] == 1
+        assert pool.stats()["dropped"] > 0
+        receiver.cancel()
+        await pool.aclose()
+    run(main())
+
+
+def _ping_frames(recently_sent: bool = False, **kwargs):
+    async def main():
+        listener = WebsocketListener(_RequestManager(), ping_interval=0.01, **kwargs)
+        connection = listener.connection = _Connection()
+        if recently_sent: listener.last_sent = monotonic()
+        pinger = create_task(listener.ping())
+        await wait_for(_until(lambda: len(connection.pings) >= 3), 2)
+        pinger.cancel()
+        return connection.sent
+    return run(main())
+
+
+def test_idle_connection_gets_keepalive_frames():
+    frames = _ping_frames(keepalive_interval=0.01)
+    assert frames and set(frames) == {'{"t":8}'}
+
+
+def test_keepalive_is_skipped_after_other_frames():
+    assert _ping_frames(True, keepalive_interval=60) == []
+
+
+def test_keepalive_frames_can_be_disabled():
+    assert _ping_frames(keepalive_interval=None) == []
+
+
+def test_foreign_threads_are_skipped_before_parsing():
+    async def main():
+        listener = WebsocketListener(_RequestManager(), reconnect=False)
+        listener.shard = (0, 2)
+        parsed = []
+
+        class _Codec(type(listener.json_codec)):
+            def loads(self, data):
+                parsed.append(data)
+                return super().loads(data)
+
+        listener.json_codec = _Codec()
+        connection = listener.connection = _Connection()
+        received = []
+        listener.subscribe(lambda message: received.append(message.thread_id))
+        receiver = create_task(listener.receive())
+        for thread_id in (1, 2, 3, 4): connection.push({"t": 1, "msg": {"threadId": thread_id, "messageId": thread_id}})
+        # The ACK of a message sent to a thread of another shard still resolves it.
+        acked = create_task(listener.send_request(1, True, 9, threadId=1, msg={}))
+        await wait_for(_until(lambda: connection.sent), 2)
+        connection.push({"t": 2, "serverAck": {"seqId": 9, "threadId": 1, "apiCode": 0}})
+        assert (await wait_for(acked, 2))["seqId"] == 9
+        await _until(lambda: len(received) == 2)
+        receiver.cancel()
+        return received, listener.skipped, len(parsed)
+    # Only the two own messages and the ACK are parsed.
+    assert run(main()) == ([2, 4], 2, 3)
@@ -0,0 +1,34 @@
+from asyncio import gather
+from asyncio import run
+from projz.runner.worker import _open_shared_session
+
+
+class _Client:
+    logins = 0
+
+    def __init__(self):
+        self.device_id = None
+        self.auth_result = None
+
+    async def login_secret(self, secret: str) -> str:
+        _Client.logins += 1
+        self.device_id = "device"
+        return f"session of {secret}"
+
+    async def _auth(self, auth_result: str):
+        self.auth_result = auth_result
+
+
+def test_account_is_logged_in_once_per_shard_owner():
+    async def main():
+        sessions = {}
+        clients = [_Client() for _ in range(3)]
+        await gather(*(
+            _open_shared_session(client, {"secret": "s"}, index == 1, 0, sessions) for index, client in enumerate(clients)
+        ))
+        # A restarted worker reuses the session as well.
+        await _open_shared_session(_Client(), {"secret": "s"}, True, 0, sessions)
+        return clients
+    clients = run(main())
+    assert _Client.logins == 1
+    assert {(client.device_id, client.auth_result) for client in clients} == {("device", "session of s")}